@@ -34,18 +34,19 @@ async def async_attach_trigger(
         else None
     )
 
+    @callback
+    def filter_event(event):
+        """Check that the event data matches the configured schema."""
+        try:
+            event_data_schema(event.data)
+        except vol.Invalid:
+            # If event data doesn't match requested schema, skip event
+            return False
+        return True
+
     @callback
     def handle_event(event):
         """Listen for events and calls the action when data matches."""
-        if event_data_schema:
-            # Check that the event data matches the configured
-            # schema if one was provided
-            try:
-                event_data_schema(event.data)
-            except vol.Invalid:
-                # If event data doesn't match requested schema, skip event
-                return
-
         hass.async_run_job(
             action(
                 {"trigger": {"platform": platform_type, "event": event}},
@@ -53,4 +54,8 @@ async def async_attach_trigger(
             )
         )
 
-    return hass.bus.async_listen(event_type, handle_event)
+    return hass.bus.async_listen(
+        event_type,
+        handle_event,
+        event_filter=filter_event if event_data_schema else None,
+    )
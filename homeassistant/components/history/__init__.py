@@ -1,22 +1,30 @@
 """Provide pre-made queries on top of the recorder component."""
+import asyncio
 from collections import defaultdict
 from datetime import timedelta
-from itertools import groupby
+from itertools import chain, groupby
 import json
 import logging
 import time
 from typing import Optional, cast
 
 from aiohttp import web
+from aiohttp.hdrs import CONTENT_TYPE
 from sqlalchemy import and_, func
 import voluptuous as vol
 
 from homeassistant.components import recorder
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
+    STATISTICS_PERIOD_5MINUTE,
+    STATISTICS_PERIOD_DAY,
+    STATISTICS_PERIOD_HOUR,
+    StateAttributes,
     States,
+    Statistics,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
+    statistics_period_start,
 )
 from homeassistant.components.recorder.util import execute, session_scope
 from homeassistant.const import (
@@ -24,10 +32,12 @@ from homeassistant.const import (
     CONF_ENTITIES,
     CONF_EXCLUDE,
     CONF_INCLUDE,
+    CONTENT_TYPE_JSON,
     HTTP_BAD_REQUEST,
 )
 from homeassistant.core import Context, State, split_entity_id
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
@@ -40,6 +50,12 @@ CONF_ORDER = "use_include_order"
 STATE_KEY = "state"
 LAST_CHANGED_KEY = "last_changed"
 
+# Keys of the compact format
+COMPACT_ENTITY_ID_KEY = "entity_id"
+COMPACT_STATES_KEY = "s"
+COMPACT_LAST_UPDATED_KEY = "lu"
+COMPACT_ATTRIBUTES_KEY = "a"
+
 # Not reusing from entityfilter because history does not support glob filtering
 _FILTER_SCHEMA_INNER = vol.Schema(
     {
@@ -78,6 +94,21 @@ NEED_ATTRIBUTE_DOMAINS = {
 }
 SCRIPT_DOMAIN = "script"
 ATTR_CAN_CANCEL = "can_cancel"
+ATTR_MIN = "min"
+ATTR_MAX = "max"
+
+# Rows fetched from the database at a time and size of the
+# chunks written to the client for streamed responses
+STREAM_YIELD_PER = 1000
+STREAM_CHUNK_SIZE = 65536
+
+# Time windows longer than these are served from the recorder statistics
+# of the period for the entities that have them
+STATISTICS_PERIOD_THRESHOLDS = (
+    (timedelta(days=60), STATISTICS_PERIOD_DAY),
+    (timedelta(days=7), STATISTICS_PERIOD_HOUR),
+    (timedelta(days=1), STATISTICS_PERIOD_5MINUTE),
+)
 
 QUERY_STATES = [
     States.domain,
@@ -87,9 +118,25 @@ QUERY_STATES = [
     States.last_changed,
     States.last_updated,
     States.created,
+    StateAttributes.shared_attrs,
+]
+
+QUERY_STATISTICS = [
+    Statistics.entity_id,
+    Statistics.start,
+    Statistics.min,
+    Statistics.mean,
+    Statistics.max,
 ]
 
 
+def _query_states(session):
+    """Return a query for QUERY_STATES with the shared attributes joined in."""
+    return session.query(*QUERY_STATES).outerjoin(
+        StateAttributes, States.attributes_id == StateAttributes.attributes_id
+    )
+
+
 def get_significant_states(hass, *args, **kwargs):
     """Wrap _get_significant_states with a sql session."""
     with session_scope(hass=hass) as session:
@@ -106,6 +153,7 @@ def _get_significant_states(
     include_start_time_state=True,
     significant_changes_only=True,
     minimal_response=False,
+    excluded_entity_ids=None,
 ):
     """
     Return states changes during UTC period start_time - end_time.
@@ -113,11 +161,51 @@ def _get_significant_states(
     Significant states are all states where there is a state change,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
+
+    The changes of excluded_entity_ids are not returned.
     """
     timer_start = time.perf_counter()
 
+    query = _significant_states_query(
+        session,
+        start_time,
+        end_time,
+        entity_ids,
+        filters,
+        significant_changes_only,
+        excluded_entity_ids,
+    )
+
+    states = execute(query)
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        elapsed = time.perf_counter() - timer_start
+        _LOGGER.debug("get_significant_states took %fs", elapsed)
+
+    return _sorted_states_to_json(
+        hass,
+        session,
+        states,
+        start_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        minimal_response,
+    )
+
+
+def _significant_states_query(
+    session,
+    start_time,
+    end_time,
+    entity_ids,
+    filters,
+    significant_changes_only,
+    excluded_entity_ids,
+):
+    """Return the query for the significant states sorted by entity_id."""
     if significant_changes_only:
-        query = session.query(*QUERY_STATES).filter(
+        query = _query_states(session).filter(
             (
                 States.domain.in_(SIGNIFICANT_DOMAINS)
                 | (States.last_changed == States.last_updated)
@@ -125,7 +213,7 @@ def _get_significant_states(
             & (States.last_updated > start_time)
         )
     else:
-        query = session.query(*QUERY_STATES).filter(States.last_updated > start_time)
+        query = _query_states(session).filter(States.last_updated > start_time)
 
     if filters:
         query = filters.apply(query, entity_ids)
@@ -133,30 +221,109 @@ def _get_significant_states(
     if end_time is not None:
         query = query.filter(States.last_updated < end_time)
 
-    query = query.order_by(States.entity_id, States.last_updated)
+    if excluded_entity_ids:
+        query = query.filter(~States.entity_id.in_(excluded_entity_ids))
 
-    states = execute(query)
+    return query.order_by(States.entity_id, States.last_updated)
 
-    if _LOGGER.isEnabledFor(logging.DEBUG):
-        elapsed = time.perf_counter() - timer_start
-        _LOGGER.debug("get_significant_states took %fs", elapsed)
 
-    return _sorted_states_to_json(
-        hass,
+def _stream_significant_states(
+    hass,
+    session,
+    start_time,
+    end_time,
+    entity_ids,
+    filters,
+    include_start_time_state,
+    significant_changes_only,
+    minimal_response,
+    compact=False,
+):
+    """Yield the significant states as JSON in pieces.
+
+    The content is the one of the history period view with the entities
+    sorted by entity_id. The rows are fetched STREAM_YIELD_PER at a time
+    and encoded one by one, so the memory used does not grow with the
+    length of the period. In the compact format the states of an entity
+    are encoded together.
+    """
+    encode = JSONEncoder(sort_keys=True, allow_nan=False).encode
+
+    statistics = {}
+    statistics_period = _statistics_period(start_time, end_time)
+    if statistics_period is not None:
+        statistics = _get_statistics(
+            hass, session, statistics_period, start_time, end_time, entity_ids, filters,
+        )
+
+    # There is one state at the start time per entity at most
+    start_states = {}
+    if include_start_time_state:
+        run = recorder.run_information_from_instance(hass, start_time)
+        for state in _get_states_with_session(
+            session, start_time, entity_ids, run=run, filters=filters
+        ):
+            if state.entity_id in statistics:
+                continue
+            state.last_changed = start_time
+            state.last_updated = start_time
+            start_states[state.entity_id] = state
+
+    query = _significant_states_query(
         session,
-        states,
         start_time,
+        end_time,
         entity_ids,
         filters,
-        include_start_time_state,
-        minimal_response,
-    )
+        significant_changes_only,
+        list(statistics),
+    ).yield_per(STREAM_YIELD_PER)
+
+    def entities_states():
+        """Yield the states of each entity."""
+        yield from statistics.values()
+        for ent_id, group in groupby(query, lambda state: state.entity_id):
+            start_state = start_states.pop(ent_id, None)
+            states = _entity_states_to_json(
+                ent_id, group, start_state, minimal_response
+            )
+            if start_state is not None:
+                states = chain((start_state,), states)
+            yield states
+        # Entities without changes during the period
+        for start_state in start_states.values():
+            yield (start_state,)
+
+    if compact:
+        separator = "["
+        for states in entities_states():
+            states = list(states)
+            if states:
+                yield separator
+                yield encode(_states_to_compact_json(states))
+                separator = ","
+        yield "[]" if separator == "[" else "]"
+        return
+
+    yield "["
+    entity_separator = "["
+    for states in entities_states():
+        separator = entity_separator
+        for state in states:
+            yield separator
+            yield encode(state)
+            separator = ","
+        # Entities without any state are left out
+        if separator == ",":
+            yield "]"
+            entity_separator = ",["
+    yield "]"
 
 
 def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     with session_scope(hass=hass) as session:
-        query = session.query(*QUERY_STATES).filter(
+        query = _query_states(session).filter(
             (States.last_changed == States.last_updated)
             & (States.last_updated > start_time)
         )
@@ -165,7 +332,7 @@ def state_changes_during_period(hass, start_time, end_time=None, entity_id=None)
             query = query.filter(States.last_updated < end_time)
 
         if entity_id is not None:
-            query = query.filter_by(entity_id=entity_id.lower())
+            query = query.filter(States.entity_id == entity_id.lower())
 
         entity_ids = [entity_id] if entity_id is not None else None
 
@@ -179,12 +346,12 @@ def get_last_state_changes(hass, number_of_states, entity_id):
     start_time = dt_util.utcnow()
 
     with session_scope(hass=hass) as session:
-        query = session.query(*QUERY_STATES).filter(
+        query = _query_states(session).filter(
             States.last_changed == States.last_updated
         )
 
         if entity_id is not None:
-            query = query.filter_by(entity_id=entity_id.lower())
+            query = query.filter(States.entity_id == entity_id.lower())
 
         entity_ids = [entity_id] if entity_id is not None else None
 
@@ -223,7 +390,7 @@ def _get_states_with_session(
     session, utc_point_in_time, entity_ids=None, run=None, filters=None
 ):
     """Return the states at a specific point in time."""
-    query = session.query(*QUERY_STATES)
+    query = _query_states(session)
 
     if entity_ids and len(entity_ids) == 1:
         # Use an entirely different (and extremely fast) query if we only
@@ -329,61 +496,171 @@ def _sorted_states_to_json(
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug("getting %d first datapoints took %fs", len(result), elapsed)
 
-    # Called in a tight loop so cache the function
-    # here
-    _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
-
     # Append all changes to it
     for ent_id, group in groupby(states, lambda state: state.entity_id):
-        domain = split_entity_id(ent_id)[0]
         ent_results = result[ent_id]
-        if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
-            ent_results.extend(
-                [
-                    native_state
-                    for native_state in (LazyState(db_state) for db_state in group)
-                    if (
-                        domain != SCRIPT_DOMAIN
-                        or native_state.attributes.get(ATTR_CAN_CANCEL)
-                    )
-                ]
+        ent_results.extend(
+            _entity_states_to_json(
+                ent_id,
+                group,
+                ent_results[-1] if ent_results else None,
+                minimal_response,
             )
+        )
+
+    # Filter out the empty lists if some states had 0 results.
+    return {key: val for key, val in result.items() if val}
+
+
+def _entity_states_to_json(entity_id, db_states, prev_state, minimal_response):
+    """Yield the JSON friendly states of an entity from its sorted rows.
+
+    prev_state is the state already in the result before the rows, if any.
+    """
+    domain = split_entity_id(entity_id)[0]
+    if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
+        for db_state in db_states:
+            native_state = LazyState(db_state)
+            if domain != SCRIPT_DOMAIN or native_state.attributes.get(ATTR_CAN_CANCEL):
+                yield native_state
+        return
+
+    # With minimal response we only provide a native
+    # State for the first and last response. All the states
+    # in-between only provide the "state" and the
+    # "last_changed".
+    if prev_state is None:
+        first_state = next(db_states, None)
+        if first_state is None:
+            return
+        prev_state = first_state
+        yield LazyState(first_state)
+
+    # Called in a tight loop so cache the function
+    # here
+    _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
+
+    # The last state change is only known to be the last one
+    # once all the rows are consumed, it is then returned as
+    # a full state
+    last_change = None
+    for db_state in db_states:
+        # With minimal response we do not care about attribute
+        # changes so we can filter out duplicate states
+        if db_state.state == prev_state.state:
             continue
 
-        # With minimal response we only provide a native
-        # State for the first and last response. All the states
-        # in-between only provide the "state" and the
-        # "last_changed".
-        if not ent_results:
-            ent_results.append(LazyState(next(group)))
+        if last_change is not None:
+            yield {
+                STATE_KEY: last_change.state,
+                LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
+                    last_change.last_changed
+                ),
+            }
+        last_change = prev_state = db_state
 
-        prev_state = ent_results[-1]
-        initial_state_count = len(ent_results)
+    if last_change is not None:
+        yield LazyState(last_change)
 
-        for db_state in group:
-            # With minimal response we do not care about attribute
-            # changes so we can filter out duplicate states
-            if db_state.state == prev_state.state:
-                continue
 
-            ent_results.append(
-                {
-                    STATE_KEY: db_state.state,
-                    LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
-                        db_state.last_changed
-                    ),
-                }
-            )
-            prev_state = db_state
+def _states_to_compact_json(states):
+    """Convert the states of an entity to the compact format.
 
-        if prev_state and len(ent_results) != initial_state_count:
-            # There was at least one state change
-            # replace the last minimal state with
-            # a full state
-            ent_results[-1] = LazyState(prev_state)
+    The states and last updated timestamps are returned as parallel
+    lists. The first timestamp is in milliseconds since the epoch, the
+    next ones are the milliseconds elapsed since the previous state. The
+    attributes are only returned with the index of the state for the
+    states they changed with. The last changed timestamp of a state is
+    the last updated one of the first state of its run of equal states.
+    """
+    values = []
+    timestamps = []
+    attributes = []
+    prev_timestamp = 0
+    prev_attributes = None
+    for index, state in enumerate(states):
+        values.append(state.state)
+        timestamp = round(state.last_updated.timestamp() * 1000)
+        timestamps.append(timestamp - prev_timestamp)
+        prev_timestamp = timestamp
+        if state.attributes != prev_attributes:
+            prev_attributes = state.attributes
+            attributes.append([index, prev_attributes])
+
+    return {
+        COMPACT_ENTITY_ID_KEY: states[0].entity_id,
+        COMPACT_STATES_KEY: values,
+        COMPACT_LAST_UPDATED_KEY: timestamps,
+        COMPACT_ATTRIBUTES_KEY: attributes,
+    }
 
-    # Filter out the empty lists if some states had 0 results.
-    return {key: val for key, val in result.items() if val}
+
+def _statistics_period(start_time, end_time):
+    """Return the statistics period to serve start_time - end_time from."""
+    for min_duration, period in STATISTICS_PERIOD_THRESHOLDS:
+        if end_time - start_time > min_duration:
+            return period
+    return None
+
+
+def _get_statistics(
+    hass, session, period, start_time, end_time, entity_ids=None, filters=None
+):
+    """Return statistics during UTC period start_time - end_time as states.
+
+    Only entities with statistics from the beginning of the period are
+    returned, the others need to be served from their recorded states.
+    """
+    timer_start = time.perf_counter()
+    first_start = statistics_period_start(period, start_time)
+
+    query = session.query(*QUERY_STATISTICS).filter(
+        (Statistics.period == period)
+        & (Statistics.start >= first_start)
+        & (Statistics.start < end_time)
+    )
+
+    if filters:
+        query = filters.apply(query, entity_ids, Statistics)
+    elif entity_ids is not None:
+        query = query.filter(Statistics.entity_id.in_(entity_ids))
+
+    query = query.order_by(Statistics.entity_id, Statistics.start)
+
+    result = {}
+    for ent_id, group in groupby(execute(query), lambda row: row.entity_id):
+        first_row = next(group)
+        if process_timestamp(first_row.start) != first_start:
+            continue
+
+        # Statistics do not keep the attributes, use the current ones
+        # so the unit and name are known
+        current_state = hass.states.get(ent_id)
+        attributes = dict(current_state.attributes) if current_state else {}
+
+        result[ent_id] = [
+            _statistics_to_state(ent_id, row, attributes)
+            for row in chain((first_row,), group)
+        ]
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        elapsed = time.perf_counter() - timer_start
+        _LOGGER.debug("get_statistics took %fs", elapsed)
+
+    return result
+
+
+def _statistics_to_state(entity_id, row, attributes):
+    """Convert a statistics row into a State with the mean as state."""
+    start = process_timestamp(row.start)
+    return State(
+        entity_id,
+        str(row.mean),
+        {**attributes, ATTR_MIN: row.min, ATTR_MAX: row.max},
+        start,
+        start,
+        validate_entity_id=False,
+    )
 
 
 def get_state(hass, utc_point_in_time, entity_id, run=None):
@@ -465,10 +742,39 @@ class HistoryPeriodView(HomeAssistantView):
             request.query.get("significant_changes_only", "1") != "0"
         )
 
-        minimal_response = "minimal_response" in request.query
+        # The compact format only returns the attributes when they change
+        compact = "compact" in request.query
+        minimal_response = "minimal_response" in request.query and not compact
 
         hass = request.app["hass"]
 
+        if "stream" in request.query:
+            response = web.StreamResponse(headers={CONTENT_TYPE: CONTENT_TYPE_JSON})
+            response.enable_compression()
+            response.enable_chunked_encoding()
+            await response.prepare(request)
+
+            def write(data):
+                """Write data to the response from the executor."""
+                asyncio.run_coroutine_threadsafe(
+                    response.write(data), hass.loop
+                ).result()
+
+            await hass.async_add_executor_job(
+                self._stream_significant_states_json,
+                hass,
+                write,
+                start_time,
+                end_time,
+                entity_ids,
+                include_start_time_state,
+                significant_changes_only,
+                minimal_response,
+                compact,
+            )
+            await response.write_eof()
+            return response
+
         return cast(
             web.Response,
             await hass.async_add_executor_job(
@@ -480,9 +786,56 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                compact,
             ),
         )
 
+    def _stream_significant_states_json(
+        self,
+        hass,
+        write,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        compact,
+    ):
+        """Stream significant states from the database as json to write.
+
+        The entities are sorted by entity_id, the configured include
+        order is not applied.
+        """
+        timer_start = time.perf_counter()
+
+        with session_scope(hass=hass) as session:
+            chunk = []
+            chunk_size = 0
+            for data in _stream_significant_states(
+                hass,
+                session,
+                start_time,
+                end_time,
+                entity_ids,
+                self.filters,
+                include_start_time_state,
+                significant_changes_only,
+                minimal_response,
+                compact,
+            ):
+                chunk.append(data)
+                chunk_size += len(data)
+                if chunk_size >= STREAM_CHUNK_SIZE:
+                    write("".join(chunk).encode("UTF-8"))
+                    chunk.clear()
+                    chunk_size = 0
+            write("".join(chunk).encode("UTF-8"))
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug("Streamed states in %fs", elapsed)
+
     def _sorted_significant_states_json(
         self,
         hass,
@@ -492,11 +845,25 @@ class HistoryPeriodView(HomeAssistantView):
         include_start_time_state,
         significant_changes_only,
         minimal_response,
+        compact,
     ):
         """Fetch significant stats from the database as json."""
         timer_start = time.perf_counter()
 
         with session_scope(hass=hass) as session:
+            statistics = {}
+            statistics_period = _statistics_period(start_time, end_time)
+            if statistics_period is not None:
+                statistics = _get_statistics(
+                    hass,
+                    session,
+                    statistics_period,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    self.filters,
+                )
+
             result = _get_significant_states(
                 hass,
                 session,
@@ -507,8 +874,17 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                list(statistics),
             )
 
+        if statistics:
+            result = {
+                ent_id: statistics.get(ent_id, states)
+                for ent_id, states in result.items()
+            }
+            for ent_id, states in statistics.items():
+                result.setdefault(ent_id, states)
+
         result = list(result.values())
         if _LOGGER.isEnabledFor(logging.DEBUG):
             elapsed = time.perf_counter() - timer_start
@@ -527,6 +903,9 @@ class HistoryPeriodView(HomeAssistantView):
             sorted_result.extend(result)
             result = sorted_result
 
+        if compact:
+            result = [_states_to_compact_json(states) for states in result]
+
         return self.json(result)
 
 
@@ -540,9 +919,11 @@ class Filters:
         self.included_entities = []
         self.included_domains = []
 
-    def apply(self, query, entity_ids=None):
+    def apply(self, query, entity_ids=None, model=States):
         """Apply the include/exclude filter on domains and entities on query.
 
+        The filter is applied on the domain and entity_id columns of model.
+
         Following rules apply:
         * only the include section is configured - just query the specified
           entities or domains.
@@ -553,43 +934,43 @@ class Filters:
         """
         # specific entities requested - do not in/exclude anything
         if entity_ids is not None:
-            return query.filter(States.entity_id.in_(entity_ids))
-        query = query.filter(~States.domain.in_(IGNORE_DOMAINS))
+            return query.filter(model.entity_id.in_(entity_ids))
+        query = query.filter(~model.domain.in_(IGNORE_DOMAINS))
 
         filter_query = None
         # filter if only excluded domain is configured
         if self.excluded_domains and not self.included_domains:
-            filter_query = ~States.domain.in_(self.excluded_domains)
+            filter_query = ~model.domain.in_(self.excluded_domains)
             if self.included_entities:
-                filter_query &= States.entity_id.in_(self.included_entities)
+                filter_query &= model.entity_id.in_(self.included_entities)
         # filter if only included domain is configured
         elif not self.excluded_domains and self.included_domains:
-            filter_query = States.domain.in_(self.included_domains)
+            filter_query = model.domain.in_(self.included_domains)
             if self.included_entities:
-                filter_query |= States.entity_id.in_(self.included_entities)
+                filter_query |= model.entity_id.in_(self.included_entities)
         # filter if included and excluded domain is configured
         elif self.excluded_domains and self.included_domains:
-            filter_query = ~States.domain.in_(self.excluded_domains)
+            filter_query = ~model.domain.in_(self.excluded_domains)
             if self.included_entities:
-                filter_query &= States.domain.in_(
+                filter_query &= model.domain.in_(
                     self.included_domains
-                ) | States.entity_id.in_(self.included_entities)
+                ) | model.entity_id.in_(self.included_entities)
             else:
-                filter_query &= States.domain.in_(
+                filter_query &= model.domain.in_(
                     self.included_domains
-                ) & ~States.domain.in_(self.excluded_domains)
+                ) & ~model.domain.in_(self.excluded_domains)
         # no domain filter just included entities
         elif (
             not self.excluded_domains
             and not self.included_domains
             and self.included_entities
         ):
-            filter_query = States.entity_id.in_(self.included_entities)
+            filter_query = model.entity_id.in_(self.included_entities)
         if filter_query is not None:
             query = query.filter(filter_query)
         # finally apply excluded entities filter if configured
         if self.excluded_entities:
-            query = query.filter(~States.entity_id.in_(self.excluded_entities))
+            query = query.filter(~model.entity_id.in_(self.excluded_entities))
         return query
 
 
@@ -621,7 +1002,9 @@ class LazyState(State):
         """State attributes."""
         if not self._attributes:
             try:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(
+                    self._row.shared_attrs or self._row.attributes
+                )
             except ValueError:
                 # When json.loads fails
                 _LOGGER.exception("Error converting row to state: %s", self)
@@ -659,6 +1042,21 @@ class LazyState(State):
         """Set last updated datetime."""
         self._last_updated = value
 
+    def as_dict(self):
+        """Return a dict representation of the LazyState.
+
+        Not cached like the one of State as the dates of a LazyState
+        can be changed.
+        """
+        return {
+            "entity_id": self.entity_id,
+            "state": self.state,
+            "attributes": self.attributes,
+            "last_changed": self.last_changed.isoformat(),
+            "last_updated": self.last_updated.isoformat(),
+            "context": self.context.as_dict(),
+        }
+
     def __eq__(self, other):
         """Return the comparison."""
         return (
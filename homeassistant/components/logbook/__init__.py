@@ -1,11 +1,10 @@
 """Event parser and human readable log generator."""
 from datetime import timedelta
-from itertools import groupby
+from itertools import groupby, islice
 import json
 import logging
-import time
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import and_, false, or_
 from sqlalchemy.orm import aliased
 import voluptuous as vol
 
@@ -13,15 +12,12 @@ from homeassistant.components import sun
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
     Events,
+    StateAttributes,
     States,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
 )
-from homeassistant.components.recorder.util import (
-    QUERY_RETRY_WAIT,
-    RETRIES,
-    session_scope,
-)
+from homeassistant.components.recorder.util import glob_to_like, session_scope
 from homeassistant.const import (
     ATTR_DEVICE_CLASS,
     ATTR_DOMAIN,
@@ -43,6 +39,7 @@ from homeassistant.const import (
 from homeassistant.core import DOMAIN as HA_DOMAIN, callback, split_entity_id
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import (
+    CONF_ENTITY_GLOBS,
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
     convert_include_exclude_filter,
     generate_filter,
@@ -173,12 +170,30 @@ class LogbookView(HomeAssistantView):
             if end_day is None:
                 return self.json_message("Invalid end_time", HTTP_BAD_REQUEST)
 
+        # Pages are requested with the time of the oldest entry of
+        # the previous page as before
+        limit = request.query.get("limit")
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                return self.json_message("Invalid limit", HTTP_BAD_REQUEST)
+            if limit < 1:
+                return self.json_message("Invalid limit", HTTP_BAD_REQUEST)
+
+        before = request.query.get("before")
+        if before is not None:
+            before = dt_util.parse_datetime(before)
+            if before is None:
+                return self.json_message("Invalid before", HTTP_BAD_REQUEST)
+            end_day = min(dt_util.as_utc(end_day), dt_util.as_utc(before))
+
         hass = request.app["hass"]
 
         def json_events():
             """Fetch events and generate JSON."""
             return self.json(
-                _get_events(hass, self.config, start_day, end_day, entity_id)
+                _get_events(hass, self.config, start_day, end_day, entity_id, limit)
             )
 
         return await hass.async_add_job(json_events)
@@ -314,30 +329,68 @@ def humanify(hass, events, entity_attr_cache, prev_states=None):
                 }
 
 
-def _get_related_entity_ids(session, entity_filter):
-    timer_start = time.perf_counter()
+def _states_filter_from_config(config):
+    """Return the SQL filter on the states matching the include/exclude config.
 
-    query = session.query(States).with_entities(States.entity_id).distinct()
+    This mirrors the cases of generate_filter.
+    """
+    include = config.get(CONF_INCLUDE, {})
+    exclude = config.get(CONF_EXCLUDE, {})
+    include_entities = include.get(CONF_ENTITIES, [])
+    include_domains = include.get(CONF_DOMAINS, [])
+    include_globs = include.get(CONF_ENTITY_GLOBS, [])
+    exclude_entities = exclude.get(CONF_ENTITIES, [])
+    exclude_domains = exclude.get(CONF_DOMAINS, [])
+    exclude_globs = exclude.get(CONF_ENTITY_GLOBS, [])
+
+    if any("[" in glob for glob in include_globs + exclude_globs):
+        # Character sets are not supported by LIKE, only filter in Python
+        return None
+
+    have_include = bool(include_entities or include_domains or include_globs)
+    have_exclude = bool(exclude_entities or exclude_domains or exclude_globs)
+
+    if have_include and not have_exclude:
+        return _states_matching(include_entities, include_domains, include_globs)
+
+    if not have_include and have_exclude:
+        return ~_states_matching(exclude_entities, exclude_domains, exclude_globs)
+
+    if include_domains or include_globs:
+        domain_included = _states_matching([], include_domains, [])
+        glob_included = _states_matching([], [], include_globs)
+        return or_(
+            domain_included & ~_states_matching(exclude_entities, [], exclude_globs),
+            ~domain_included
+            & glob_included
+            & ~_states_matching(exclude_entities, exclude_domains, exclude_globs),
+            ~domain_included
+            & ~glob_included
+            & _states_matching(include_entities, [], []),
+        )
 
-    for tryno in range(RETRIES):
-        try:
-            result = [row.entity_id for row in query if entity_filter(row.entity_id)]
+    if exclude_domains or exclude_globs:
+        domain_excluded = _states_matching([], exclude_domains, exclude_globs)
+        return or_(
+            domain_excluded & _states_matching(include_entities, [], []),
+            ~domain_excluded & ~_states_matching(exclude_entities, [], []),
+        )
 
-            if _LOGGER.isEnabledFor(logging.DEBUG):
-                elapsed = time.perf_counter() - timer_start
-                _LOGGER.debug(
-                    "fetching %d distinct domain/entity_id pairs took %fs",
-                    len(result),
-                    elapsed,
-                )
+    return _states_matching(include_entities, [], [])
 
-            return result
-        except SQLAlchemyError as err:
-            _LOGGER.error("Error executing query: %s", err)
 
-            if tryno == RETRIES - 1:
-                raise
-            time.sleep(QUERY_RETRY_WAIT)
+def _states_matching(entity_ids, domains, globs):
+    """Return the SQL condition on the states matching any of the arguments."""
+    conditions = []
+    if entity_ids:
+        conditions.append(States.entity_id.in_(entity_ids))
+    if domains:
+        conditions.append(States.domain.in_(domains))
+    for glob in globs:
+        conditions.append(States.entity_id.like(glob_to_like(glob), escape="\\"))
+    if not conditions:
+        return false()
+    return or_(*conditions)
 
 
 def _all_entities_filter(_):
@@ -345,8 +398,12 @@ def _all_entities_filter(_):
     return True
 
 
-def _get_events(hass, config, start_day, end_day, entity_id=None):
-    """Get events for a period of time."""
+def _get_events(hass, config, start_day, end_day, entity_id=None, limit=None):
+    """Get events for a period of time.
+
+    With a limit, only the events of the last limit entries of the
+    period are returned.
+    """
     entity_attr_cache = EntityAttributeCache(hass)
 
     def yield_events(query):
@@ -356,16 +413,26 @@ def _get_events(hass, config, start_day, end_day, entity_id=None):
             if _keep_event(hass, event, entities_filter, entity_attr_cache):
                 yield event
 
+    # Continuous sensors are not shown, the ones that have been
+    # removed since are filtered out from their recorded attributes
+    continuous_entity_ids = [
+        state.entity_id
+        for state in hass.states.all()
+        if state.domain in CONTINUOUS_DOMAINS
+        and state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+    ]
+
     with session_scope(hass=hass) as session:
         if entity_id is not None:
             entity_ids = [entity_id.lower()]
             entities_filter = generate_filter([], entity_ids, [], [])
+            states_filter = States.entity_id.in_(entity_ids)
         elif config.get(CONF_EXCLUDE) or config.get(CONF_INCLUDE):
             entities_filter = convert_include_exclude_filter(config)
-            entity_ids = _get_related_entity_ids(session, entities_filter)
+            states_filter = _states_filter_from_config(config)
         else:
             entities_filter = _all_entities_filter
-            entity_ids = None
+            states_filter = None
 
         old_state = aliased(States, name="old_state")
 
@@ -380,10 +447,14 @@ def _get_events(hass, config, start_day, end_day, entity_id=None):
                 States.entity_id,
                 States.domain,
                 States.attributes,
+                StateAttributes.shared_attrs,
                 old_state.state_id.label("old_state_id"),
             )
-            .order_by(Events.time_fired)
             .outerjoin(States, (Events.event_id == States.event_id))
+            .outerjoin(
+                StateAttributes,
+                (States.attributes_id == StateAttributes.attributes_id),
+            )
             .outerjoin(old_state, (States.old_state_id == old_state.state_id))
             # The below filter, removes state change events that do not have
             # and old_state, new_state, or the old and
@@ -409,23 +480,36 @@ def _get_events(hass, config, start_day, end_day, entity_id=None):
             .filter((Events.time_fired > start_day) & (Events.time_fired < end_day))
         )
 
-        if entity_ids:
-            query = query.filter(
-                (
-                    (States.last_updated == States.last_changed)
-                    & States.entity_id.in_(entity_ids)
+        states_conditions = [States.last_updated == States.last_changed]
+        if states_filter is not None:
+            states_conditions.append(states_filter)
+        if continuous_entity_ids:
+            states_conditions.append(
+                ~(
+                    States.domain.in_(CONTINUOUS_DOMAINS)
+                    & States.entity_id.in_(continuous_entity_ids)
                 )
-                | (States.state_id.is_(None))
             )
+        query = query.filter(and_(*states_conditions) | (States.state_id.is_(None)))
+
+        if limit is None:
+            events = yield_events(query.order_by(Events.time_fired))
         else:
-            query = query.filter(
-                (States.last_updated == States.last_changed)
-                | (States.state_id.is_(None))
+            # Keyset pagination, walk back from the end of the period
+            # until there are enough events
+            events = list(
+                islice(
+                    yield_events(
+                        query.order_by(Events.time_fired.desc(), Events.event_id.desc())
+                    ),
+                    limit,
+                )
             )
+            events.reverse()
 
         # When all data is schema v8 or later, prev_states can be removed
         prev_states = {}
-        return list(humanify(hass, yield_events(query), entity_attr_cache, prev_states))
+        return list(humanify(hass, events, entity_attr_cache, prev_states))
 
 
 def _keep_event(hass, event, entities_filter, entity_attr_cache):
@@ -589,13 +673,11 @@ class LazyEventPartialState:
     def attributes(self):
         """State attributes."""
         if not self._attributes:
-            if (
-                self._row.attributes is None
-                or self._row.attributes == EMPTY_JSON_OBJECT
-            ):
+            attributes = self._row.shared_attrs or self._row.attributes
+            if attributes is None or attributes == EMPTY_JSON_OBJECT:
                 self._attributes = {}
             else:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(attributes)
         return self._attributes
 
     @property
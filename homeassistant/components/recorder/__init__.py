@@ -1,9 +1,10 @@
 """Support for recording details."""
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime
 import logging
+import math
 import queue
 import threading
 import time
@@ -17,6 +18,9 @@ import voluptuous as vol
 from homeassistant.components import persistent_notification
 from homeassistant.const import (
     ATTR_ENTITY_ID,
+    ATTR_UNIT_OF_MEASUREMENT,
+    CONF_DOMAINS,
+    CONF_ENTITIES,
     CONF_EXCLUDE,
     EVENT_HOMEASSISTANT_START,
     EVENT_HOMEASSISTANT_STOP,
@@ -27,6 +31,7 @@ from homeassistant.const import (
 from homeassistant.core import CoreState, HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import (
+    CONF_ENTITY_GLOBS,
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
     INCLUDE_EXCLUDE_FILTER_SCHEMA_INNER,
     convert_include_exclude_filter,
@@ -35,8 +40,17 @@ from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
 
 from . import migration, purge
-from .const import DATA_INSTANCE
-from .models import Base, Events, RecorderRuns, States
+from .const import CONF_KEEP_DAYS, DATA_INSTANCE
+from .models import (
+    STATISTICS_PERIODS,
+    Base,
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    Statistics,
+    statistics_period_start,
+)
 from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
@@ -60,6 +74,8 @@ DEFAULT_DB_FILE = "home-assistant_v2.db"
 DEFAULT_DB_MAX_RETRIES = 10
 DEFAULT_DB_RETRY_WAIT = 3
 KEEPALIVE_TIME = 30
+STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
+STATISTICS_DOMAINS = ("sensor",)
 
 CONF_AUTO_PURGE = "auto_purge"
 CONF_DB_URL = "db_url"
@@ -69,6 +85,14 @@ CONF_PURGE_KEEP_DAYS = "purge_keep_days"
 CONF_PURGE_INTERVAL = "purge_interval"
 CONF_EVENT_TYPES = "event_types"
 CONF_COMMIT_INTERVAL = "commit_interval"
+CONF_RETENTION = "retention"
+
+RETENTION_SCHEMA = vol.All(
+    cv.has_at_least_one_key(CONF_DOMAINS, CONF_ENTITIES, CONF_ENTITY_GLOBS),
+    INCLUDE_EXCLUDE_FILTER_SCHEMA_INNER.extend(
+        {vol.Required(CONF_KEEP_DAYS): vol.All(vol.Coerce(int), vol.Range(min=1))}
+    ),
+)
 
 EXCLUDE_SCHEMA = INCLUDE_EXCLUDE_FILTER_SCHEMA_INNER.extend(
     {vol.Optional(CONF_EVENT_TYPES): vol.All(cv.ensure_list, [cv.string])}
@@ -91,6 +115,9 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(CONF_PURGE_INTERVAL, default=1): vol.All(
                         vol.Coerce(int), vol.Range(min=0)
                     ),
+                    vol.Optional(CONF_RETENTION, default=[]): vol.All(
+                        cv.ensure_list, [RETENTION_SCHEMA]
+                    ),
                     vol.Optional(CONF_DB_URL): cv.string,
                     vol.Optional(CONF_COMMIT_INTERVAL, default=1): vol.All(
                         vol.Coerce(int), vol.Range(min=0)
@@ -155,6 +182,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     entity_filter = convert_include_exclude_filter(conf)
     auto_purge = conf[CONF_AUTO_PURGE]
     keep_days = conf[CONF_PURGE_KEEP_DAYS]
+    retention = conf[CONF_RETENTION]
     commit_interval = conf[CONF_COMMIT_INTERVAL]
     db_max_retries = conf[CONF_DB_MAX_RETRIES]
     db_retry_wait = conf[CONF_DB_RETRY_WAIT]
@@ -168,6 +196,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         hass=hass,
         auto_purge=auto_purge,
         keep_days=keep_days,
+        retention=retention,
         commit_interval=commit_interval,
         uri=db_url,
         db_max_retries=db_max_retries,
@@ -200,6 +229,7 @@ class Recorder(threading.Thread):
         hass: HomeAssistant,
         auto_purge: bool,
         keep_days: int,
+        retention: List[dict],
         commit_interval: int,
         uri: str,
         db_max_retries: int,
@@ -213,6 +243,7 @@ class Recorder(threading.Thread):
         self.hass = hass
         self.auto_purge = auto_purge
         self.keep_days = keep_days
+        self.retention = retention
         self.commit_interval = commit_interval
         self.queue: Any = queue.Queue()
         self.recording_start = dt_util.utcnow()
@@ -228,7 +259,12 @@ class Recorder(threading.Thread):
 
         self._timechanges_seen = 0
         self._keepalive_count = 0
-        self._old_state_ids = {}
+        self._old_states = {}
+        self._pending_expunge = []
+        self._state_attributes_ids = OrderedDict()
+        self._pending_state_attributes = {}
+        self._statistics = {}
+        self._statistics_lookup_before = self.recording_start
         self.event_session = None
         self.get_session = None
         self._completed_database_setup = False
@@ -344,7 +380,13 @@ class Recorder(threading.Thread):
                 self.queue.task_done()
                 return
             if isinstance(event, PurgeTask):
-                purge.purge_old_data(self, event.keep_days, event.repack)
+                # The purge may have removed attributes that are no
+                # longer used by any state
+                self._state_attributes_ids.clear()
+                # Queue the next batch behind the events that came in
+                # while this one was purged
+                if not purge.purge_old_data(self, event.keep_days, event.repack):
+                    self.queue.put(PurgeTask(event.keep_days, event.repack))
                 self.queue.task_done()
                 continue
             if event.event_type == EVENT_TIME_CHANGED:
@@ -370,33 +412,48 @@ class Recorder(threading.Thread):
                     continue
 
             try:
-                dbevent = Events.from_event(event)
                 if event.event_type == EVENT_STATE_CHANGED:
-                    dbevent.event_data = "{}"
+                    # The states are stored in the states table, do not
+                    # encode them a second time just to discard them
+                    dbevent = Events.from_event(event, event_data="{}")
+                else:
+                    dbevent = Events.from_event(event)
                 self.event_session.add(dbevent)
-                self.event_session.flush()
             except (TypeError, ValueError):
                 _LOGGER.warning("Event is not JSON serializable: %s", event)
+                self.queue.task_done()
+                continue
             except Exception as err:  # pylint: disable=broad-except
                 # Must catch the exception to prevent the loop from collapsing
                 _LOGGER.exception("Error adding event: %s", err)
+                self.queue.task_done()
+                continue
 
-            if dbevent and event.event_type == EVENT_STATE_CHANGED:
+            if event.event_type == EVENT_STATE_CHANGED:
                 try:
                     dbstate = States.from_event(event)
-                    dbstate.old_state_id = self._old_state_ids.get(dbstate.entity_id)
-                    dbstate.event_id = dbevent.event_id
+                    # The event and old state ids are not known until the
+                    # session is flushed, link the rows through relationships
+                    # and let the flush at commit time resolve them in bulk.
+                    dbstate.event = dbevent
+                    self._link_state_attributes(dbstate)
+                    old_state = self._old_states.pop(dbstate.entity_id, None)
+                    if old_state is not None:
+                        if old_state.state_id:
+                            dbstate.old_state_id = old_state.state_id
+                        else:
+                            dbstate.old_state = old_state
                     self.event_session.add(dbstate)
-                    self.event_session.flush()
                     if "new_state" in event.data:
-                        self._old_state_ids[dbstate.entity_id] = dbstate.state_id
-                    elif dbstate.entity_id in self._old_state_ids:
-                        del self._old_state_ids[dbstate.entity_id]
+                        self._old_states[dbstate.entity_id] = dbstate
+                        self._pending_expunge.append(dbstate)
+                    self._compile_statistics(event.data.get("new_state"))
                 except (TypeError, ValueError):
                     _LOGGER.warning(
                         "State is not JSON serializable: %s",
                         event.data.get("new_state"),
                     )
+                    self.event_session.expunge(dbevent)
                 except Exception as err:  # pylint: disable=broad-except
                     # Must catch the exception to prevent the loop from collapsing
                     _LOGGER.exception("Error adding state change: %s", err)
@@ -408,6 +465,95 @@ class Recorder(threading.Thread):
 
             self.queue.task_done()
 
+    def _link_state_attributes(self, dbstate):
+        """Point a state at the shared row holding its attributes."""
+        shared_attrs = dbstate.attributes
+        dbstate.attributes = None
+
+        attributes_id = self._state_attributes_ids.get(shared_attrs)
+        if attributes_id is not None:
+            self._state_attributes_ids.move_to_end(shared_attrs)
+            dbstate.attributes_id = attributes_id
+            return
+
+        db_attributes = self._pending_state_attributes.get(shared_attrs)
+        if db_attributes is not None:
+            dbstate.state_attributes = db_attributes
+            return
+
+        # Do not flush the pending rows of the current batch
+        # just to look up the attributes
+        with self.event_session.no_autoflush:
+            res = (
+                self.event_session.query(StateAttributes.attributes_id)
+                .filter(
+                    StateAttributes.hash
+                    == StateAttributes.hash_shared_attrs(shared_attrs)
+                )
+                .filter(StateAttributes.shared_attrs == shared_attrs)
+                .first()
+            )
+        if res is not None:
+            self._cache_state_attributes_id(shared_attrs, res.attributes_id)
+            dbstate.attributes_id = res.attributes_id
+            return
+
+        db_attributes = StateAttributes.from_shared_attrs(shared_attrs)
+        self._pending_state_attributes[shared_attrs] = db_attributes
+        dbstate.state_attributes = db_attributes
+
+    def _compile_statistics(self, state):
+        """Add a numeric state to the statistics of its entity."""
+        if (
+            state is None
+            or state.domain not in STATISTICS_DOMAINS
+            or ATTR_UNIT_OF_MEASUREMENT not in state.attributes
+        ):
+            return
+        try:
+            value = float(state.state)
+        except ValueError:
+            return
+        if not math.isfinite(value):
+            return
+
+        for period in STATISTICS_PERIODS:
+            start = statistics_period_start(period, state.last_updated)
+            key = (period, state.entity_id)
+            cached = self._statistics.get(key)
+            if cached is None or cached[0] != start:
+                dbstatistics = None
+                if start < self._statistics_lookup_before:
+                    # The period may have been started before the cache
+                    # was, continue its row if there is one
+                    with self.event_session.no_autoflush:
+                        dbstatistics = (
+                            self.event_session.query(Statistics)
+                            .filter(Statistics.period == period)
+                            .filter(Statistics.entity_id == state.entity_id)
+                            .filter(Statistics.start == start)
+                            .first()
+                        )
+                if dbstatistics is None:
+                    dbstatistics = Statistics(
+                        period=period,
+                        domain=state.domain,
+                        entity_id=state.entity_id,
+                        start=start,
+                    )
+                cached = self._statistics[key] = (start, dbstatistics)
+
+            dbstatistics = cached[1]
+            dbstatistics.add_value(value)
+            self.event_session.add(dbstatistics)
+            self._pending_expunge.append(dbstatistics)
+
+    def _cache_state_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the id of the row holding shared_attrs."""
+        self._state_attributes_ids[shared_attrs] = attributes_id
+        if len(self._state_attributes_ids) > STATE_ATTRIBUTES_ID_CACHE_SIZE:
+            self._state_attributes_ids.popitem(last=False)
+
     def _send_keep_alive(self):
         try:
             _LOGGER.debug("Sending keepalive")
@@ -478,10 +624,33 @@ class Recorder(threading.Thread):
 
     def _commit_event_session(self):
         try:
+            if self._pending_expunge or self._pending_state_attributes:
+                self.event_session.flush()
+                pending_state_attributes = self._pending_state_attributes
+                for shared_attrs, db_attributes in pending_state_attributes.items():
+                    self._cache_state_attributes_id(
+                        shared_attrs, db_attributes.attributes_id
+                    )
+                self._pending_state_attributes = {}
+                # Detach the rows we keep around to link the next state
+                # change of the same entity or to update its statistics,
+                # so their columns stay loaded after the commit expires
+                # the session.
+                for dbrow in self._pending_expunge:
+                    if dbrow in self.event_session:
+                        self.event_session.expunge(dbrow)
+                self._pending_expunge = []
             self.event_session.commit()
         except Exception as err:
             _LOGGER.error("Error executing query: %s", err)
             self.event_session.rollback()
+            # Rows that were rolled back can no longer be used to link
+            # the next state change of their entity.
+            self._old_states = {}
+            self._pending_expunge = []
+            self._pending_state_attributes = {}
+            self._statistics = {}
+            self._statistics_lookup_before = dt_util.utcnow()
             raise
 
     @callback
@@ -1,3 +1,5 @@
 """Recorder constants."""
 
 DATA_INSTANCE = "recorder_instance"
+
+CONF_KEEP_DAYS = "keep_days"
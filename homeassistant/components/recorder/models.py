@@ -1,11 +1,15 @@
 """Models for SQLAlchemy."""
+from datetime import timedelta
 import json
 import logging
+import zlib
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -14,6 +18,7 @@ from sqlalchemy import (
     distinct,
 )
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import foreign, relationship
 from sqlalchemy.orm.session import Session
 
 from homeassistant.core import Context, Event, EventOrigin, State, split_entity_id
@@ -24,12 +29,22 @@ import homeassistant.util.dt as dt_util
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 9
+SCHEMA_VERSION = 11
 
 _LOGGER = logging.getLogger(__name__)
 
 DB_TIMEZONE = "+00:00"
 
+STATISTICS_PERIOD_5MINUTE = "5minute"
+STATISTICS_PERIOD_HOUR = "hour"
+STATISTICS_PERIOD_DAY = "day"
+
+STATISTICS_PERIODS = {
+    STATISTICS_PERIOD_5MINUTE: timedelta(minutes=5),
+    STATISTICS_PERIOD_HOUR: timedelta(hours=1),
+    STATISTICS_PERIOD_DAY: timedelta(days=1),
+}
+
 
 class Events(Base):  # type: ignore
     """Event history data."""
@@ -52,11 +67,17 @@ class Events(Base):  # type: ignore
     )
 
     @staticmethod
-    def from_event(event):
-        """Create an event database object from a native event."""
+    def from_event(event, event_data=None):
+        """Create an event database object from a native event.
+
+        Pass event_data to store already encoded data instead of encoding
+        the event data.
+        """
+        if event_data is None:
+            event_data = json.dumps(event.data, cls=JSONEncoder)
         return Events(
             event_type=event.event_type,
-            event_data=json.dumps(event.data, cls=JSONEncoder),
+            event_data=event_data,
             origin=str(event.origin),
             time_fired=event.time_fired,
             context_id=event.context.id,
@@ -99,6 +120,17 @@ class States(Base):  # type: ignore
     last_updated = Column(DateTime(timezone=True), default=dt_util.utcnow, index=True)
     created = Column(DateTime(timezone=True), default=dt_util.utcnow)
     old_state_id = Column(Integer)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
+    event = relationship("Events", uselist=False)
+    old_state = relationship(
+        "States",
+        primaryjoin=lambda: foreign(States.old_state_id) == States.state_id,
+        remote_side=lambda: [States.state_id],
+        uselist=False,
+    )
+    state_attributes = relationship("StateAttributes", uselist=False)
 
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
@@ -132,11 +164,14 @@ class States(Base):  # type: ignore
 
     def to_native(self, validate_entity_id=True):
         """Convert to an HA state object."""
+        attributes = self.attributes
+        if attributes is None and self.state_attributes is not None:
+            attributes = self.state_attributes.shared_attrs
         try:
             return State(
                 self.entity_id,
                 self.state,
-                json.loads(self.attributes),
+                json.loads(attributes),
                 process_timestamp(self.last_changed),
                 process_timestamp(self.last_updated),
                 # Join the events table on event_id to get the context instead
@@ -150,6 +185,91 @@ class States(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):  # type: ignore
+    """State attribute change history.
+
+    Attributes are stored once per distinct content and shared by all
+    the states that carry them.
+    """
+
+    __tablename__ = "state_attributes"
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def from_shared_attrs(shared_attrs):
+        """Create a state attributes database object from encoded attributes."""
+        return StateAttributes(
+            hash=StateAttributes.hash_shared_attrs(shared_attrs),
+            shared_attrs=shared_attrs,
+        )
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash of the encoded attributes used to look them up."""
+        return zlib.crc32(shared_attrs.encode("utf-8"))
+
+    def to_native(self):
+        """Convert to the state attributes dict."""
+        try:
+            return json.loads(self.shared_attrs)
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to state attributes: %s", self)
+            return {}
+
+
+class Statistics(Base):  # type: ignore
+    """Downsampled history of numeric states.
+
+    Each row covers one period of one entity, starting at start.
+    """
+
+    __tablename__ = "statistics"
+    statistics_id = Column(Integer, primary_key=True)
+    period = Column(String(16))
+    domain = Column(String(64))
+    entity_id = Column(String(255))
+    start = Column(DateTime(timezone=True))
+    min = Column(Float)
+    mean = Column(Float)
+    max = Column(Float)
+    last = Column(Float)
+    count = Column(Integer)
+
+    __table_args__ = (
+        # Used for fetching the statistics of entities in a time window
+        # (get_statistics in history.py)
+        Index("ix_statistics_period_entity_id_start", "period", "entity_id", "start"),
+        Index("ix_statistics_period_start", "period", "start"),
+    )
+
+    def add_value(self, value):
+        """Add a value recorded during the period."""
+        if not self.count:
+            self.min = self.mean = self.max = value
+            self.count = 1
+        else:
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+            self.count += 1
+            self.mean += (value - self.mean) / self.count
+        self.last = value
+
+
+def statistics_period_start(period, timestamp):
+    """Return the UTC start of the statistics period timestamp is in."""
+    timestamp = dt_util.as_utc(timestamp)
+    if period == STATISTICS_PERIOD_5MINUTE:
+        return timestamp.replace(
+            minute=timestamp.minute - timestamp.minute % 5, second=0, microsecond=0
+        )
+    if period == STATISTICS_PERIOD_HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
 class RecorderRuns(Base):  # type: ignore
     """Representation of recorder run."""
 
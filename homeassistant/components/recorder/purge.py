@@ -2,40 +2,120 @@
 from datetime import timedelta
 import logging
 
+from sqlalchemy import exists, or_
 from sqlalchemy.exc import SQLAlchemyError
 
+from homeassistant.const import CONF_DOMAINS, CONF_ENTITIES
+from homeassistant.helpers.entityfilter import CONF_ENTITY_GLOBS
 import homeassistant.util.dt as dt_util
 
-from .models import Events, RecorderRuns, States
-from .util import session_scope
+from .const import CONF_KEEP_DAYS
+from .models import (
+    STATISTICS_PERIOD_5MINUTE,
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    Statistics,
+)
+from .util import glob_to_like, session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# Number of rows deleted per batch, the recorder processes
+# queued events between the batches
+MAX_ROWS_TO_PURGE = 1000
+
 
 def purge_old_data(instance, purge_days, repack):
-    """Purge events and states older than purge_days ago."""
-    purge_before = dt_util.utcnow() - timedelta(days=purge_days)
+    """Purge events, states and 5 minute statistics older than purge_days ago.
+
+    States matching one of the retention rules of the recorder are kept
+    for the keep_days of the first matching rule instead.
+
+    Rows are deleted in batches of MAX_ROWS_TO_PURGE, each one in its own
+    transaction. Returns False if there is more data to purge, the caller
+    should then call it again once it processed its pending work.
+    """
+    now = dt_util.utcnow()
+    purge_before = now - timedelta(days=purge_days)
     _LOGGER.debug("Purging events before %s", purge_before)
 
     try:
         with session_scope(session=instance.get_session()) as session:
-            deleted_rows = (
-                session.query(States)
-                .filter(States.last_updated < purge_before)
-                .delete(synchronize_session=False)
+            ruled_states = []
+            for rule in instance.retention:
+                rule_states = _retention_rule_filter(rule)
+                rule_purge_before = now - timedelta(days=rule[CONF_KEEP_DAYS])
+                query = session.query(States.state_id).filter(
+                    rule_states & (States.last_updated < rule_purge_before)
+                )
+                if ruled_states:
+                    # The first matching rule applies
+                    query = query.filter(~or_(*ruled_states))
+                ruled_states.append(rule_states)
+
+                state_ids = _select_ids(query)
+                if state_ids:
+                    # The other events are kept until the global cutoff
+                    _purge_state_ids(session, state_ids, purge_events=True)
+                    return False
+
+            # States are deleted before their events as they reference them
+            query = session.query(States.state_id).filter(
+                States.last_updated < purge_before
             )
-            _LOGGER.debug("Deleted %s states", deleted_rows)
+            if ruled_states:
+                query = query.filter(~or_(*ruled_states))
+            state_ids = _select_ids(query)
+            if state_ids:
+                _purge_state_ids(session, state_ids, purge_events=False)
+                return False
 
-            deleted_rows = (
-                session.query(Events)
-                .filter(Events.time_fired < purge_before)
-                .delete(synchronize_session=False)
+            query = session.query(Events.event_id).filter(
+                Events.time_fired < purge_before
             )
-            _LOGGER.debug("Deleted %s events", deleted_rows)
+            if ruled_states:
+                # Keep the events of the states retained for longer
+                query = query.filter(
+                    ~exists().where(States.event_id == Events.event_id)
+                )
+            event_ids = _select_ids(query)
+            if event_ids:
+                deleted_rows = (
+                    session.query(Events)
+                    .filter(Events.event_id.in_(event_ids))
+                    .delete(synchronize_session=False)
+                )
+                _LOGGER.debug("Deleted %s events", deleted_rows)
+                return False
 
+            # Only the hourly and daily statistics are kept for the long term
+            statistics_ids = _select_ids(
+                session.query(Statistics.statistics_id)
+                .filter(Statistics.period == STATISTICS_PERIOD_5MINUTE)
+                .filter(Statistics.start < purge_before)
+            )
+            if statistics_ids:
+                deleted_rows = (
+                    session.query(Statistics)
+                    .filter(Statistics.statistics_id.in_(statistics_ids))
+                    .delete(synchronize_session=False)
+                )
+                _LOGGER.debug("Deleted %s statistics", deleted_rows)
+                return False
+
+            # History needs the runs to find the states at a point in time
+            runs_purge_before = min(
+                [purge_before]
+                + [
+                    now - timedelta(days=rule[CONF_KEEP_DAYS])
+                    for rule in instance.retention
+                ]
+            )
             deleted_rows = (
                 session.query(RecorderRuns)
-                .filter(RecorderRuns.start < purge_before)
+                .filter(RecorderRuns.start < runs_purge_before)
                 .delete(synchronize_session=False)
             )
             _LOGGER.debug("Deleted %s recorder_runs", deleted_rows)
@@ -48,7 +128,68 @@ def purge_old_data(instance, purge_days, repack):
             # Optimize mysql / mariadb tables to free up space on disk
             elif instance.engine.driver == "mysqldb":
                 _LOGGER.debug("Optimizing SQL DB to free space")
-                instance.engine.execute("OPTIMIZE TABLE states, events, recorder_runs")
+                instance.engine.execute(
+                    "OPTIMIZE TABLE states, state_attributes, statistics, events, "
+                    "recorder_runs"
+                )
 
     except SQLAlchemyError as err:
         _LOGGER.warning("Error purging history: %s.", err)
+
+    return True
+
+
+def _select_ids(query):
+    """Return the ids of the next batch of rows to purge."""
+    return [row[0] for row in query.limit(MAX_ROWS_TO_PURGE)]
+
+
+def _retention_rule_filter(rule):
+    """Return the filter on the states a retention rule applies to."""
+    conditions = []
+    if rule[CONF_DOMAINS]:
+        conditions.append(States.domain.in_(rule[CONF_DOMAINS]))
+    if rule[CONF_ENTITIES]:
+        conditions.append(States.entity_id.in_(rule[CONF_ENTITIES]))
+    for glob in rule[CONF_ENTITY_GLOBS]:
+        conditions.append(States.entity_id.like(glob_to_like(glob), escape="\\"))
+    return or_(*conditions)
+
+
+def _purge_state_ids(session, state_ids, purge_events):
+    """Delete states and the attributes only they were using."""
+    attributes_ids = set()
+    event_ids = set()
+    for state in session.query(States.attributes_id, States.event_id).filter(
+        States.state_id.in_(state_ids)
+    ):
+        if state.attributes_id is not None:
+            attributes_ids.add(state.attributes_id)
+        if state.event_id is not None:
+            event_ids.add(state.event_id)
+
+    deleted_rows = (
+        session.query(States)
+        .filter(States.state_id.in_(state_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s states", deleted_rows)
+
+    if purge_events and event_ids:
+        deleted_rows = (
+            session.query(Events)
+            .filter(Events.event_id.in_(event_ids))
+            .delete(synchronize_session=False)
+        )
+        _LOGGER.debug("Deleted %s events", deleted_rows)
+
+    if not attributes_ids:
+        return
+
+    deleted_rows = (
+        session.query(StateAttributes)
+        .filter(StateAttributes.attributes_id.in_(attributes_ids))
+        .filter(~exists().where(States.attributes_id == StateAttributes.attributes_id))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s state attributes", deleted_rows)
@@ -94,3 +94,14 @@ def execute(qry, to_native=False, validate_entity_ids=True):
             if tryno == RETRIES - 1:
                 raise
             time.sleep(QUERY_RETRY_WAIT)
+
+
+def glob_to_like(glob):
+    """Convert an entity glob to a LIKE pattern escaped with a backslash."""
+    return (
+        glob.replace("\\", "\\\\")
+        .replace("%", "\\%")
+        .replace("_", "\\_")
+        .replace("*", "%")
+        .replace("?", "_")
+    )
@@ -3,9 +3,8 @@ import asyncio
 
 import voluptuous as vol
 
-from homeassistant.auth.permissions.const import POLICY_READ
-from homeassistant.const import EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL
-from homeassistant.core import DOMAIN as HASS_DOMAIN, callback
+from homeassistant.const import EVENT_STATE_CHANGED, MATCH_ALL
+from homeassistant.core import DOMAIN as HASS_DOMAIN, callback, split_entity_id
 from homeassistant.exceptions import HomeAssistantError, ServiceNotFound, Unauthorized
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.event import async_track_state_change
@@ -13,6 +12,7 @@ from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.loader import IntegrationNotFound, async_get_integration
 
 from . import const, decorators, messages
+from .fanout import async_subscribe_events
 
 # mypy: allow-untyped-calls, allow-untyped-defs
 
@@ -21,6 +21,7 @@ from . import const, decorators, messages
 def async_register_commands(hass, async_reg):
     """Register commands."""
     async_reg(hass, handle_subscribe_events)
+    async_reg(hass, handle_subscribe_states)
     async_reg(hass, handle_unsubscribe_events)
     async_reg(hass, handle_call_service)
     async_reg(hass, handle_get_states)
@@ -30,6 +31,7 @@ def async_register_commands(hass, async_reg):
     async_reg(hass, handle_render_template)
     async_reg(hass, handle_manifest_list)
     async_reg(hass, handle_manifest_get)
+    async_reg(hass, handle_supported_features)
 
 
 def pong_message(iden):
@@ -55,34 +57,120 @@ def handle_subscribe_events(hass, connection, msg):
     if event_type not in SUBSCRIBE_WHITELIST and not connection.user.is_admin:
         raise Unauthorized
 
-    if event_type == EVENT_STATE_CHANGED:
+    connection.subscriptions[msg["id"]] = async_subscribe_events(
+        hass, connection, msg["id"], event_type
+    )
 
-        @callback
-        def forward_events(event):
-            """Forward state changed events to websocket."""
-            if not connection.user.permissions.check_entity(
-                event.data["entity_id"], POLICY_READ
-            ):
-                return
+    connection.send_message(messages.result_message(msg["id"]))
 
-            connection.send_message(messages.event_message(msg["id"], event))
 
-    else:
+@callback
+@decorators.websocket_command(
+    {
+        vol.Required("type"): "subscribe_states",
+        vol.Optional("entity_ids"): cv.entity_ids,
+        vol.Optional("domains"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("attributes"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("compressed", default=False): cv.boolean,
+    }
+)
+def handle_subscribe_states(hass, connection, msg):
+    """Handle subscribe states command.
+
+    Only the state changes of the given entities and domains are forwarded,
+    or of all entities if none are given. If attributes are given, the
+    states only contain those attributes.
+
+    In compressed mode a snapshot of the states is sent first, followed by
+    the added ("a"), changed ("c") and removed ("r") states. Changed states
+    only contain the keys that differ.
+    """
+    entity_ids = set(msg.get("entity_ids", ()))
+    domains = set(msg.get("domains", ()))
+    attributes = msg.get("attributes")
+    if attributes is not None:
+        attributes = set(attributes)
 
-        @callback
-        def forward_events(event):
-            """Forward events to websocket."""
-            if event.event_type == EVENT_TIME_CHANGED:
-                return
+    @callback
+    def is_subscribed(entity_id):
+        """Return if the states of an entity are subscribed to."""
+        if (
+            (entity_ids or domains)
+            and entity_id not in entity_ids
+            and split_entity_id(entity_id)[0] not in domains
+        ):
+            return False
+
+        return connection.can_read_entity(entity_id)
+
+    @callback
+    def state_filter(event):
+        """Filter the state changes that are not subscribed to."""
+        return is_subscribed(event.data["entity_id"])
+
+    @callback
+    def forward_states(event):
+        """Forward state changed events to websocket."""
+        event_dict = event.as_dict()
+
+        if attributes is not None:
+            data = event_dict["data"]
+            data["old_state"] = messages.state_dict(data["old_state"], attributes)
+            data["new_state"] = messages.state_dict(data["new_state"], attributes)
+
+        connection.send_message(
+            messages.event_message(msg["id"], event_dict),
+            coalesce_key=(msg["id"], event.data["entity_id"]),
+        )
+
+    @callback
+    def forward_compressed_states(event):
+        """Forward the changes of state changed events to websocket."""
+        entity_id = event.data["entity_id"]
+        old_state = event.data["old_state"]
+        new_state = event.data["new_state"]
+
+        if new_state is None:
+            changes = {"r": [entity_id]}
+        elif old_state is None:
+            changes = {
+                "a": {entity_id: messages.compressed_state_dict(new_state, attributes)}
+            }
+        else:
+            changes = {
+                "c": {
+                    entity_id: messages.compressed_state_diff(
+                        old_state, new_state, attributes
+                    )
+                }
+            }
 
-            connection.send_message(messages.event_message(msg["id"], event.as_dict()))
+        connection.send_message(messages.event_message(msg["id"], changes))
 
     connection.subscriptions[msg["id"]] = hass.bus.async_listen(
-        event_type, forward_events
+        EVENT_STATE_CHANGED,
+        forward_compressed_states if msg["compressed"] else forward_states,
+        event_filter=state_filter,
     )
 
     connection.send_message(messages.result_message(msg["id"]))
 
+    if not msg["compressed"]:
+        return
+
+    connection.send_message(
+        messages.event_message(
+            msg["id"],
+            {
+                "a": {
+                    state.entity_id: messages.compressed_state_dict(state, attributes)
+                    for state in hass.states.async_all()
+                    if is_subscribed(state.entity_id)
+                }
+            },
+        )
+    )
+
 
 @callback
 @decorators.websocket_command(
@@ -162,7 +250,16 @@ async def handle_call_service(hass, connection, msg):
 def handle_get_states(hass, connection, msg):
     """Handle get states command."""
     if connection.user.permissions.access_all_entities("read"):
-        states = hass.states.async_all()
+        try:
+            states_json = _async_get_all_states_json(hass)
+        except (ValueError, TypeError):
+            # Let the writer report the data it is unable to serialize
+            states = hass.states.async_all()
+        else:
+            connection.send_message(
+                messages.result_message_json(msg["id"], states_json)
+            )
+            return
     else:
         entity_perm = connection.user.permissions.check_entity
         states = [
@@ -174,6 +271,34 @@ def handle_get_states(hass, connection, msg):
     connection.send_message(messages.result_message(msg["id"], states))
 
 
+@callback
+def _async_get_all_states_json(hass):
+    """Return the JSON of all states.
+
+    The JSON is shared by all get_states requests until the next state
+    change. Only the changed states are encoded again, the others reuse
+    the JSON cached on the state.
+    """
+    if const.DATA_STATES_JSON not in hass.data:
+
+        @callback
+        def async_invalidate_states_json(event):
+            """Drop the JSON of all states when a state changes."""
+            hass.data[const.DATA_STATES_JSON] = None
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, async_invalidate_states_json)
+        hass.data[const.DATA_STATES_JSON] = None
+
+    states_json = hass.data[const.DATA_STATES_JSON]
+
+    if states_json is None:
+        states_json = hass.data[const.DATA_STATES_JSON] = (
+            "[" + ", ".join(state.as_json() for state in hass.states.async_all()) + "]"
+        )
+
+    return states_json
+
+
 @decorators.websocket_command({vol.Required("type"): "get_services"})
 @decorators.async_response
 async def handle_get_services(hass, connection, msg):
@@ -263,3 +388,17 @@ def handle_render_template(hass, connection, msg):
 
     connection.send_result(msg["id"])
     state_listener()
+
+
+@callback
+@decorators.websocket_command(
+    {vol.Required("type"): "supported_features", vol.Required("features"): dict}
+)
+def handle_supported_features(hass, connection, msg):
+    """Handle setting the features the client supports.
+
+    With coalesce_messages, multiple messages can be sent as a JSON list in
+    a single frame.
+    """
+    connection.supported_features = msg["features"]
+    connection.send_result(msg["id"])
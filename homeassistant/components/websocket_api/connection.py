@@ -4,6 +4,7 @@ from typing import Any, Callable, Dict, Hashable, Optional
 
 import voluptuous as vol
 
+from homeassistant.auth.permissions.const import POLICY_READ
 from homeassistant.core import Context, callback
 from homeassistant.exceptions import Unauthorized
 
@@ -28,6 +29,9 @@ class ActiveConnection:
 
         self.subscriptions: Dict[Hashable, Callable[[], Any]] = {}
         self.last_id = 0
+        self.supported_features: Dict[str, Any] = {}
+        self._entity_permissions = None
+        self._entity_readable: Dict[str, bool] = {}
 
     def context(self, msg):
         """Return a context."""
@@ -36,6 +40,26 @@ class ActiveConnection:
             return Context()
         return Context(user_id=user.id)
 
+    @callback
+    def can_read_entity(self, entity_id: str) -> bool:
+        """Return if the user can read the state of an entity.
+
+        The result is cached until the permissions of the user change.
+        """
+        permissions = self.user.permissions
+
+        # The permissions object is replaced when the user permissions change
+        if permissions is not self._entity_permissions:
+            self._entity_permissions = permissions
+            self._entity_readable = {}
+
+        readable = self._entity_readable.get(entity_id)
+        if readable is None:
+            readable = self._entity_readable[entity_id] = permissions.check_entity(
+                entity_id, POLICY_READ
+            )
+        return readable
+
     @callback
     def send_result(self, msg_id: int, result: Optional[Any] = None) -> None:
         """Send a result message."""
@@ -31,6 +31,9 @@ ERR_TIMEOUT = "timeout"
 
 TYPE_RESULT = "result"
 
+# Features a client can announce with the supported_features command
+FEATURE_COALESCE_MESSAGES = "coalesce_messages"
+
 # Define the possible errors that occur when connections are cancelled.
 # Originally, this was just asyncio.CancelledError, but issue #9546 showed
 # that futures.CancelledErrors can also occur in some situations.
@@ -43,4 +46,10 @@ SIGNAL_WEBSOCKET_DISCONNECTED = "websocket_disconnected"
 # Data used to store the current connection list
 DATA_CONNECTIONS = f"{DOMAIN}.connections"
 
+# Data used to store the JSON of all states until the next state change
+DATA_STATES_JSON = f"{DOMAIN}.states_json"
+
+# Data used to store the event fan out per event type
+DATA_EVENT_FANOUT = f"{DOMAIN}.event_fanout"
+
 JSON_DUMP = partial(json.dumps, cls=JSONEncoder, allow_nan=False)
@@ -0,0 +1,98 @@
+"""Fan out bus events to the websocket subscriptions."""
+from typing import List, Optional, Tuple
+
+from homeassistant.const import EVENT_STATE_CHANGED, EVENT_TIME_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, callback
+
+from . import const, messages
+from .connection import ActiveConnection
+
+# mypy: allow-untyped-calls, allow-untyped-defs
+
+
+@callback
+def async_subscribe_events(
+    hass, connection: ActiveConnection, iden: int, event_type: str
+) -> CALLBACK_TYPE:
+    """Forward the events of a type to a websocket subscription."""
+    fanouts = hass.data.setdefault(const.DATA_EVENT_FANOUT, {})
+    fanout = fanouts.get(event_type)
+
+    if fanout is None:
+        fanout = fanouts[event_type] = EventFanout(hass, event_type)
+
+    return fanout.async_add(connection, iden)
+
+
+class EventFanout:
+    """Forward the events of a type to all websocket subscriptions.
+
+    There is a single bus listener per event type and each event is
+    serialized once, the subscriptions only differ in the message id.
+    """
+
+    def __init__(self, hass, event_type: str) -> None:
+        """Initialize the fan out."""
+        self.hass = hass
+        self.event_type = event_type
+        self._subscriptions: List[Tuple[ActiveConnection, int]] = []
+        self._unsub_bus: Optional[CALLBACK_TYPE] = None
+
+    @callback
+    def async_add(self, connection: ActiveConnection, iden: int) -> CALLBACK_TYPE:
+        """Add a subscription and return a function to remove it."""
+        subscription = (connection, iden)
+        self._subscriptions.append(subscription)
+
+        if self._unsub_bus is None:
+            self._unsub_bus = self.hass.bus.async_listen(
+                self.event_type, self._async_forward
+            )
+
+        @callback
+        def remove_subscription() -> None:
+            """Remove the subscription."""
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+            if self._subscriptions or self._unsub_bus is None:
+                return
+
+            self._unsub_bus()
+            self._unsub_bus = None
+            self.hass.data[const.DATA_EVENT_FANOUT].pop(self.event_type, None)
+
+        return remove_subscription
+
+    @callback
+    def _async_forward(self, event: Event) -> None:
+        """Forward an event to the subscriptions."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return
+
+        entity_id = None
+        if self.event_type == EVENT_STATE_CHANGED:
+            entity_id = event.data["entity_id"]
+
+        payload: Optional[str] = None
+        encoded = False
+
+        # Copy as sending can close connections and remove subscriptions
+        for connection, iden in list(self._subscriptions):
+            if entity_id is not None and not connection.can_read_entity(entity_id):
+                continue
+
+            if not encoded:
+                payload = messages.event_message_json(event)
+                encoded = True
+
+            if payload is None:
+                # Let the writer report the data it is unable to serialize
+                connection.send_message(messages.event_message(iden, event.as_dict()))
+                continue
+
+            # Only the latest state of an entity matters to a client behind
+            connection.send_message(
+                payload.replace(messages.IDEN_JSON_TEMPLATE, str(iden), 1),
+                coalesce_key=None if entity_id is None else (iden, entity_id),
+            )
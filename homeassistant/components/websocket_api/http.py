@@ -1,11 +1,13 @@
 """View to accept incoming websocket connection."""
 import asyncio
+from collections import deque
 from contextlib import suppress
 import logging
-from typing import Optional
+from typing import Any, Deque, Dict, Hashable, List, Optional
 
 from aiohttp import WSMsgType, web
 import async_timeout
+import attr
 
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP
@@ -17,10 +19,12 @@ from homeassistant.util.json import (
 )
 
 from .auth import AuthPhase, auth_required_message
+from .connection import ActiveConnection
 from .const import (
     CANCELLATION_ERRORS,
     DATA_CONNECTIONS,
     ERR_UNKNOWN_ERROR,
+    FEATURE_COALESCE_MESSAGES,
     JSON_DUMP,
     MAX_PENDING_MSG,
     PENDING_MSG_PEAK,
@@ -47,6 +51,16 @@ class WebsocketAPIView(HomeAssistantView):
         return await WebSocketHandler(request.app["hass"], request).async_handle()
 
 
+@attr.s(slots=True)
+class WriterStats:
+    """Statistics of the messages written to a websocket client."""
+
+    sent_messages = attr.ib(type=int, default=0)
+    sent_frames = attr.ib(type=int, default=0)
+    coalesced_messages = attr.ib(type=int, default=0)
+    peak_pending_messages = attr.ib(type=int, default=0)
+
+
 class WebSocketHandler:
     """Handle an active websocket client connection."""
 
@@ -55,84 +69,166 @@ class WebSocketHandler:
         self.hass = hass
         self.request = request
         self.wsock: Optional[web.WebSocketResponse] = None
-        self._to_write: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING_MSG)
+        self.writer_stats = WriterStats()
+        # Pending messages are [message, coalesce key] pairs so a message
+        # can be replaced by a newer one with the same key in place
+        self._to_write: Deque[List[Any]] = deque()
+        self._to_write_coalesce: Dict[Hashable, List[Any]] = {}
+        self._to_write_ready = asyncio.Event()
+        self._connection: Optional[ActiveConnection] = None
         self._handle_task = None
         self._writer_task = None
         self._logger = logging.getLogger("{}.connection.{}".format(__name__, id(self)))
         self._peak_checker_unsub = None
+        self._peak_sent_messages = 0
+
+    @property
+    def pending_messages(self) -> int:
+        """Return the number of messages waiting to be written."""
+        return len(self._to_write)
 
     async def _writer(self):
         """Write outgoing messages."""
         # Exceptions if Socket disconnected or cancelled by connection handler
         with suppress(RuntimeError, ConnectionResetError, *CANCELLATION_ERRORS):
             while not self.wsock.closed:
-                message = await self._to_write.get()
-                if message is None:
-                    break
-
-                self._logger.debug("Sending %s", message)
-
-                if isinstance(message, str):
-                    await self.wsock.send_str(message)
-                    continue
-
-                try:
-                    dumped = JSON_DUMP(message)
-                except (ValueError, TypeError):
-                    await self.wsock.send_json(
-                        error_message(
-                            message["id"], ERR_UNKNOWN_ERROR, "Invalid JSON in response"
-                        )
-                    )
-                    self._logger.error(
-                        "Unable to serialize to JSON. Bad data found at %s",
-                        format_unserializable_data(
-                            find_paths_unserializable_data(message, dump=JSON_DUMP)
-                        ),
-                    )
+                if not self._to_write:
+                    self._to_write_ready.clear()
+                    await self._to_write_ready.wait()
                     continue
 
-                await self.wsock.send_str(dumped)
+                connection = self._connection
+                coalesce = connection is not None and connection.supported_features.get(
+                    FEATURE_COALESCE_MESSAGES
+                )
+
+                # Without client support every message is its own frame
+                messages = []
+                done = False
+                while self._to_write and (coalesce or not messages):
+                    message = self._pop_message()
+                    if message is None:
+                        done = True
+                        break
+                    messages.append(self._message_to_json(message))
+
+                if len(messages) == 1:
+                    await self.wsock.send_str(messages[0])
+                elif messages:
+                    await self.wsock.send_str("[" + ",".join(messages) + "]")
+
+                self.writer_stats.sent_messages += len(messages)
+                self.writer_stats.sent_frames += 1 if messages else 0
+
+                if done:
+                    break
 
         # Clean up the peaker checker when we shut down the writer
         if self._peak_checker_unsub:
             self._peak_checker_unsub()
             self._peak_checker_unsub = None
 
+    def _pop_message(self) -> Any:
+        """Return the next pending message."""
+        queued = self._to_write.popleft()
+        message, coalesce_key = queued
+
+        if (
+            coalesce_key is not None
+            and self._to_write_coalesce.get(coalesce_key) is queued
+        ):
+            del self._to_write_coalesce[coalesce_key]
+
+        return message
+
+    def _message_to_json(self, message: Any) -> str:
+        """Return the JSON of a message."""
+        self._logger.debug("Sending %s", message)
+
+        if isinstance(message, str):
+            return message
+
+        try:
+            return JSON_DUMP(message)
+        except (ValueError, TypeError):
+            self._logger.error(
+                "Unable to serialize to JSON. Bad data found at %s",
+                format_unserializable_data(
+                    find_paths_unserializable_data(message, dump=JSON_DUMP)
+                ),
+            )
+            return JSON_DUMP(
+                error_message(
+                    message["id"], ERR_UNKNOWN_ERROR, "Invalid JSON in response"
+                )
+            )
+
     @callback
-    def _send_message(self, message):
+    def _send_message(self, message, coalesce_key: Optional[Hashable] = None):
         """Send a message to the client.
 
+        Once the client falls behind, a pending message with the same
+        coalesce key is replaced by the new one instead of queueing both.
         Closes connection if the client is not reading the messages.
 
         Async friendly.
         """
-        try:
-            self._to_write.put_nowait(message)
-        except asyncio.QueueFull:
+        pending = len(self._to_write)
+
+        if coalesce_key is not None and pending >= PENDING_MSG_PEAK:
+            queued = self._to_write_coalesce.get(coalesce_key)
+            if queued is not None:
+                queued[0] = message
+                self.writer_stats.coalesced_messages += 1
+                return
+
+        if pending >= MAX_PENDING_MSG:
             self._logger.error(
                 "Client exceeded max pending messages [2]: %s", MAX_PENDING_MSG
             )
 
             self._cancel()
+            return
+
+        queued = [message, coalesce_key]
+        self._to_write.append(queued)
+        self._to_write_ready.set()
+        pending += 1
+
+        if coalesce_key is not None:
+            self._to_write_coalesce[coalesce_key] = queued
 
-        if self._to_write.qsize() < PENDING_MSG_PEAK:
+        if pending > self.writer_stats.peak_pending_messages:
+            self.writer_stats.peak_pending_messages = pending
+
+        if pending < PENDING_MSG_PEAK:
             if self._peak_checker_unsub:
                 self._peak_checker_unsub()
                 self._peak_checker_unsub = None
             return
 
         if self._peak_checker_unsub is None:
-            self._peak_checker_unsub = async_call_later(
-                self.hass, PENDING_MSG_PEAK_TIME, self._check_write_peak
-            )
+            self._schedule_write_peak_check()
+
+    @callback
+    def _schedule_write_peak_check(self):
+        """Schedule to check if the client is still above the write peak."""
+        self._peak_sent_messages = self.writer_stats.sent_messages
+        self._peak_checker_unsub = async_call_later(
+            self.hass, PENDING_MSG_PEAK_TIME, self._check_write_peak
+        )
 
     @callback
     def _check_write_peak(self, _):
         """Check that we are no longer above the write peak."""
         self._peak_checker_unsub = None
 
-        if self._to_write.qsize() < PENDING_MSG_PEAK:
+        if len(self._to_write) < PENDING_MSG_PEAK:
+            return
+
+        # A slow client that is still reading gets its messages coalesced
+        if self.writer_stats.sent_messages != self._peak_sent_messages:
+            self._schedule_write_peak_check()
             return
 
         self._logger.error(
@@ -151,7 +247,8 @@ class WebSocketHandler:
     async def async_handle(self) -> web.WebSocketResponse:
         """Handle a websocket response."""
         request = self.request
-        wsock = self.wsock = web.WebSocketResponse(heartbeat=55)
+        # Accept permessage-deflate for clients on slow links that offer it
+        wsock = self.wsock = web.WebSocketResponse(heartbeat=55, compress=True)
         await wsock.prepare(request)
         self._logger.debug("Connected")
         self._handle_task = asyncio.current_task()
@@ -198,7 +295,7 @@ class WebSocketHandler:
                 raise Disconnect
 
             self._logger.debug("Received %s", msg_data)
-            connection = await auth.async_handle(msg_data)
+            connection = self._connection = await auth.async_handle(msg_data)
             self.hass.data[DATA_CONNECTIONS] = (
                 self.hass.data.get(DATA_CONNECTIONS, 0) + 1
             )
@@ -241,17 +338,18 @@ class WebSocketHandler:
             if connection is not None:
                 connection.async_close()
 
-            try:
-                self._to_write.put_nowait(None)
+            if len(self._to_write) >= MAX_PENDING_MSG:
+                self._writer_task.cancel()
+            else:
+                self._to_write.append([None, None])
+                self._to_write_ready.set()
                 # Make sure all error messages are written before closing
                 await self._writer_task
-            except asyncio.QueueFull:
-                self._writer_task.cancel()
 
             await wsock.close()
 
             if disconnect_warn is None:
-                self._logger.debug("Disconnected")
+                self._logger.debug("Disconnected, %s", self.writer_stats)
             else:
                 self._logger.warning("Disconnected: %s", disconnect_warn)
 
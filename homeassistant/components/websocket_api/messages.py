@@ -1,4 +1,5 @@
 """Message templates for websocket commands."""
+from typing import Any, Container, Dict, Optional
 
 import voluptuous as vol
 
@@ -17,12 +18,31 @@ MINIMAL_MESSAGE_SCHEMA = vol.Schema(
 # Base schema to extend by message handlers
 BASE_COMMAND_MESSAGE_SCHEMA = vol.Schema({vol.Required("id"): cv.positive_int})
 
+# Keys of the compressed states
+COMPRESSED_STATE_STATE = "s"
+COMPRESSED_STATE_ATTRIBUTES = "a"
+COMPRESSED_STATE_CONTEXT = "c"
+COMPRESSED_STATE_LAST_CHANGED = "lc"
+COMPRESSED_STATE_LAST_UPDATED = "lu"
+
+# Placeholder for the message id of messages shared between subscriptions
+IDEN_TEMPLATE = "__IDEN__"
+IDEN_JSON_TEMPLATE = '"__IDEN__"'
+
 
 def result_message(iden, result=None):
     """Return a success result message."""
     return {"id": iden, "type": const.TYPE_RESULT, "success": True, "result": result}
 
 
+def result_message_json(iden: int, result_json: str) -> str:
+    """Return a success result message with a JSON encoded result."""
+    return (
+        f'{{"id": {iden}, "type": "{const.TYPE_RESULT}", "success": true, '
+        f'"result": {result_json}}}'
+    )
+
+
 def error_message(iden, code, message):
     """Return an error result message."""
     return {
@@ -36,3 +56,96 @@ def error_message(iden, code, message):
 def event_message(iden, event):
     """Return an event message."""
     return {"id": iden, "type": "event", "event": event}
+
+
+def event_message_json(event) -> Optional[str]:
+    """Return the JSON of an event message with a placeholder for the id.
+
+    Returns None if the event can't be serialized.
+    """
+    try:
+        return const.JSON_DUMP(event_message(IDEN_TEMPLATE, event.as_dict()))
+    except (ValueError, TypeError):
+        return None
+
+
+def state_dict(state, attributes: Optional[Container[str]] = None) -> Any:
+    """Return a state to send, with only the given attributes if specified."""
+    if state is None or attributes is None:
+        return state
+
+    state_as_dict = dict(state.as_dict())
+    state_as_dict["attributes"] = _filter_attributes(state, attributes)
+    return state_as_dict
+
+
+def _filter_attributes(state, attributes: Optional[Container[str]]) -> Dict:
+    """Return the attributes of a state, only the given ones if specified."""
+    if attributes is None:
+        return dict(state.attributes)
+    return {key: value for key, value in state.attributes.items() if key in attributes}
+
+
+def _compressed_context(context) -> Any:
+    """Return a compressed context, only its id if it has no user or parent."""
+    if context.parent_id is None and context.user_id is None:
+        return context.id
+    return context.as_dict()
+
+
+def compressed_state_dict(
+    state, attributes: Optional[Container[str]] = None
+) -> Dict[str, Any]:
+    """Return a compressed state.
+
+    Last updated is left out when it is the same as last changed.
+    """
+    compressed = {
+        COMPRESSED_STATE_STATE: state.state,
+        COMPRESSED_STATE_ATTRIBUTES: _filter_attributes(state, attributes),
+        COMPRESSED_STATE_CONTEXT: _compressed_context(state.context),
+        COMPRESSED_STATE_LAST_CHANGED: state.last_changed.timestamp(),
+    }
+    if state.last_updated != state.last_changed:
+        compressed[COMPRESSED_STATE_LAST_UPDATED] = state.last_updated.timestamp()
+    return compressed
+
+
+def compressed_state_diff(
+    old_state, new_state, attributes: Optional[Container[str]] = None
+) -> Dict[str, Any]:
+    """Return the changes between two states in compressed form.
+
+    Changed and added keys are under "+", removed attributes under "-".
+    """
+    additions: Dict[str, Any] = {}
+    diff: Dict[str, Any] = {"+": additions}
+
+    if old_state.state != new_state.state:
+        additions[COMPRESSED_STATE_STATE] = new_state.state
+    if old_state.context != new_state.context:
+        additions[COMPRESSED_STATE_CONTEXT] = _compressed_context(new_state.context)
+    if old_state.last_changed != new_state.last_changed:
+        additions[COMPRESSED_STATE_LAST_CHANGED] = new_state.last_changed.timestamp()
+    if old_state.last_updated != new_state.last_updated:
+        additions[COMPRESSED_STATE_LAST_UPDATED] = new_state.last_updated.timestamp()
+
+    if old_state.attributes == new_state.attributes:
+        return diff
+
+    old_attributes = _filter_attributes(old_state, attributes)
+    new_attributes = _filter_attributes(new_state, attributes)
+
+    changed_attributes = {
+        key: value
+        for key, value in new_attributes.items()
+        if key not in old_attributes or old_attributes[key] != value
+    }
+    if changed_attributes:
+        additions[COMPRESSED_STATE_ATTRIBUTES] = changed_attributes
+
+    removed_attributes = [key for key in old_attributes if key not in new_attributes]
+    if removed_attributes:
+        diff["-"] = {COMPRESSED_STATE_ATTRIBUTES: removed_attributes}
+
+    return diff
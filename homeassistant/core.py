@@ -10,6 +10,7 @@ import datetime
 import enum
 import functools
 from ipaddress import ip_address
+import json
 import logging
 import os
 import pathlib
@@ -28,11 +29,11 @@ from typing import (
     Mapping,
     Optional,
     Set,
+    Tuple,
     TypeVar,
     Union,
     cast,
 )
-import uuid
 
 from async_timeout import timeout
 import attr
@@ -74,7 +75,9 @@ from homeassistant.exceptions import (
 from homeassistant.util import location, network
 from homeassistant.util.async_ import fire_coroutine_threadsafe, run_callback_threadsafe
 import homeassistant.util.dt as dt_util
+from homeassistant.util.read_only_dict import ReadOnlyDict
 from homeassistant.util.thread import fix_threading_exception_logging
+from homeassistant.util.ulid import ulid_hex
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM, METRIC_SYSTEM, UnitSystem
 
 # Typing imports that create a circular dependency
@@ -172,6 +175,50 @@ class CoreState(enum.Enum):
         return self.value  # type: ignore
 
 
+class HassJobType(enum.Enum):
+    """Represent a job type."""
+
+    Coroutinefunction = 1
+    Callback = 2
+    Executor = 3
+
+
+class HassJob:
+    """Represent a job to be run later.
+
+    The job type is determined when the job is created so it does not
+    have to be figured out every time the job is scheduled.
+    """
+
+    __slots__ = ("target", "job_type")
+
+    def __init__(self, target: Callable) -> None:
+        """Create a job object."""
+        if asyncio.iscoroutine(target):
+            raise ValueError("Coroutine not allowed to be passed to HassJob")
+
+        self.target = target
+        self.job_type = _get_callable_job_type(target)
+
+    def __repr__(self) -> str:
+        """Return the job."""
+        return f"<Job {self.job_type} {self.target}>"
+
+
+def _get_callable_job_type(target: Callable) -> HassJobType:
+    """Determine the job type from the callable."""
+    # Check for partials to properly determine if coroutine function
+    check_target = target
+    while isinstance(check_target, functools.partial):
+        check_target = check_target.func
+
+    if asyncio.iscoroutinefunction(check_target):
+        return HassJobType.Coroutinefunction
+    if is_callback(check_target):
+        return HassJobType.Callback
+    return HassJobType.Executor
+
+
 class HomeAssistant:
     """Root object of the Home Assistant home automation."""
 
@@ -342,6 +389,36 @@ class HomeAssistant:
 
         return task
 
+    @callback
+    def async_add_hass_job(
+        self, hassjob: HassJob, *args: Any
+    ) -> Optional[asyncio.Future]:
+        """Add a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: HassJob to call.
+        args: parameters for method to call.
+        """
+        task: Optional[asyncio.Future] = None
+
+        if hassjob.job_type == HassJobType.Callback:
+            self.loop.call_soon(hassjob.target, *args)
+            return None
+
+        if hassjob.job_type == HassJobType.Coroutinefunction:
+            task = self.loop.create_task(hassjob.target(*args))
+        else:
+            task = self.loop.run_in_executor(  # type: ignore
+                None, hassjob.target, *args
+            )
+
+        # If a task is scheduled
+        if self._track_task:
+            self._pending_tasks.append(task)
+
+        return task
+
     @callback
     def async_create_task(self, target: Coroutine) -> asyncio.tasks.Task:
         """Create a task from within the eventloop.
@@ -400,6 +477,20 @@ class HomeAssistant:
         else:
             self.async_add_job(target, *args)
 
+    @callback
+    def async_run_hass_job(self, hassjob: HassJob, *args: Any) -> None:
+        """Run a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: HassJob to call.
+        args: parameters for method to call.
+        """
+        if hassjob.job_type == HassJobType.Callback:
+            hassjob.target(*args)
+        else:
+            self.async_add_hass_job(hassjob, *args)
+
     def block_till_done(self) -> None:
         """Block until all pending work is done."""
         asyncio.run_coroutine_threadsafe(
@@ -477,7 +568,7 @@ class Context:
 
     user_id = attr.ib(type=str, default=None)
     parent_id = attr.ib(type=Optional[str], default=None)
-    id = attr.ib(type=str, default=attr.Factory(lambda: uuid.uuid4().hex))
+    id = attr.ib(type=str, default=attr.Factory(ulid_hex))
 
     def as_dict(self) -> dict:
         """Return a dictionary representation of the context."""
@@ -548,12 +639,18 @@ class Event:
         )
 
 
+# A listener of the event bus and the filter its events have to pass
+_FilterableJob = Tuple[HassJob, Optional[Callable[[Event], bool]]]
+
+
 class EventBus:
     """Allow the firing of and listening for events."""
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
-        self._listeners: Dict[str, List[Callable]] = {}
+        self._listeners: Dict[str, List[_FilterableJob]] = {}
+        # Listeners to dispatch to per event type, MATCH_ALL ones included
+        self._dispatch: Dict[str, Tuple[_FilterableJob, ...]] = {}
         self._hass = hass
 
     @callback
@@ -591,6 +688,37 @@ class EventBus:
     ) -> None:
         """Fire an event.
 
+        This method must be run in the event loop.
+        """
+        listeners = self._dispatch.get(event_type)
+        if listeners is None:
+            listeners = self._async_build_dispatch(event_type)
+
+        debug = event_type != EVENT_TIME_CHANGED and _LOGGER.isEnabledFor(logging.DEBUG)
+
+        if not listeners and not debug:
+            return
+
+        event = Event(event_type, event_data, origin, None, context)
+
+        if debug:
+            _LOGGER.debug("Bus:Handling %s", event)
+
+        add_hass_job = self._hass.async_add_hass_job
+        for job, event_filter in listeners:
+            if event_filter is not None:
+                try:
+                    if not event_filter(event):
+                        continue
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error in event filter for %s", job)
+                    continue
+            add_hass_job(job, event)
+
+    @callback
+    def _async_build_dispatch(self, event_type: str) -> Tuple[_FilterableJob, ...]:
+        """Build and cache the listeners to dispatch an event type to.
+
         This method must be run in the event loop.
         """
         listeners = self._listeners.get(event_type, [])
@@ -600,16 +728,16 @@ class EventBus:
         if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
             listeners = match_all_listeners + listeners
 
-        event = Event(event_type, event_data, origin, None, context)
-
-        if event_type != EVENT_TIME_CHANGED:
-            _LOGGER.debug("Bus:Handling %s", event)
-
-        if not listeners:
-            return
+        dispatch = self._dispatch[event_type] = tuple(listeners)
+        return dispatch
 
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+    @callback
+    def _async_invalidate_dispatch(self, event_type: str) -> None:
+        """Drop the cached listeners after the listeners of a type changed."""
+        if event_type == MATCH_ALL:
+            self._dispatch.clear()
+        else:
+            self._dispatch.pop(event_type, None)
 
     def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
@@ -628,18 +756,30 @@ class EventBus:
         return remove_listener
 
     @callback
-    def async_listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
+    def async_listen(
+        self,
+        event_type: str,
+        listener: Callable,
+        event_filter: Optional[Callable[[Event], bool]] = None,
+    ) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
 
         To listen to all events specify the constant ``MATCH_ALL``
         as event_type.
 
+        An event_filter is called with the event when it is fired, the
+        listener is only scheduled if it returns True. It must be a
+        callback, it runs in the event loop before any listener is called.
+
         This method must be run in the event loop.
         """
+        filterable_job = (HassJob(listener), event_filter)
+
         if event_type in self._listeners:
-            self._listeners[event_type].append(listener)
+            self._listeners[event_type].append(filterable_job)
         else:
-            self._listeners[event_type] = [listener]
+            self._listeners[event_type] = [filterable_job]
+        self._async_invalidate_dispatch(event_type)
 
         def remove_listener() -> None:
             """Remove the listener."""
@@ -676,6 +816,7 @@ class EventBus:
 
         This method must be run in the event loop.
         """
+        job = HassJob(listener)
 
         @callback
         def onetime_listener(event: Event) -> None:
@@ -689,7 +830,7 @@ class EventBus:
             # This will make sure the second time it does nothing.
             setattr(onetime_listener, "run", True)
             self._async_remove_listener(event_type, onetime_listener)
-            self._hass.async_run_job(listener, event)
+            self._hass.async_run_hass_job(job, event)
 
         return self.async_listen(event_type, onetime_listener)
 
@@ -700,14 +841,16 @@ class EventBus:
         This method must be run in the event loop.
         """
         try:
-            self._listeners[event_type].remove(listener)
+            jobs = self._listeners[event_type]
+            jobs.remove(next(job for job in jobs if job[0].target == listener))
 
             # delete event_type list if empty
-            if not self._listeners[event_type]:
+            if not jobs:
                 self._listeners.pop(event_type)
-        except (KeyError, ValueError):
+            self._async_invalidate_dispatch(event_type)
+        except (KeyError, StopIteration):
             # KeyError is key event_type listener did not exist
-            # ValueError if listener did not exist within event_type
+            # StopIteration if listener did not exist within event_type
             _LOGGER.warning("Unable to remove unknown listener %s", listener)
 
 
@@ -729,6 +872,8 @@ class State:
         "last_changed",
         "last_updated",
         "context",
+        "_as_dict",
+        "_as_json",
     ]
 
     def __init__(
@@ -762,6 +907,8 @@ class State:
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
+        self._as_dict: Optional[Dict[str, Any]] = None
+        self._as_json: Optional[str] = None
 
     @property
     def domain(self) -> str:
@@ -787,15 +934,38 @@ class State:
 
         To be used for JSON serialization.
         Ensures: state == State.from_dict(state.as_dict())
+
+        The dict is created once and shared by all callers, it can't be
+        modified.
         """
-        return {
-            "entity_id": self.entity_id,
-            "state": self.state,
-            "attributes": dict(self.attributes),
-            "last_changed": self.last_changed,
-            "last_updated": self.last_updated,
-            "context": self.context.as_dict(),
-        }
+        if self._as_dict is None:
+            self._as_dict = ReadOnlyDict(
+                {
+                    "entity_id": self.entity_id,
+                    "state": self.state,
+                    "attributes": ReadOnlyDict(self.attributes),
+                    "last_changed": self.last_changed.isoformat(),
+                    "last_updated": self.last_updated.isoformat(),
+                    "context": ReadOnlyDict(self.context.as_dict()),
+                }
+            )
+        return self._as_dict
+
+    def as_json(self) -> str:
+        """Return the State encoded as JSON.
+
+        Async friendly.
+
+        The JSON is created once, sending a state to many clients only
+        encodes it a single time. Raises ValueError or TypeError if the
+        attributes can't be serialized.
+        """
+        if self._as_json is None:
+            # pylint: disable=import-outside-toplevel
+            from homeassistant.helpers.json import JSONEncoder
+
+            self._as_json = json.dumps(self.as_dict(), cls=JSONEncoder, allow_nan=False)
+        return self._as_json
 
     @classmethod
     def from_dict(cls, json_dict: Dict) -> Any:
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 import functools as ft
 import logging
 from timeit import default_timer as timer
-from typing import Any, Awaitable, Dict, Iterable, List, Optional, Union
+from typing import Any, Awaitable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 
 from homeassistant.config import DATA_CUSTOMIZE
 from homeassistant.const import (
@@ -24,14 +24,14 @@ from homeassistant.const import (
     TEMP_CELSIUS,
     TEMP_FAHRENHEIT,
 )
-from homeassistant.core import CALLBACK_TYPE, Context, HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, Context, HomeAssistant, State, callback
 from homeassistant.exceptions import NoEntitySpecifiedError
 from homeassistant.helpers.entity_platform import EntityPlatform
 from homeassistant.helpers.entity_registry import (
     EVENT_ENTITY_REGISTRY_UPDATED,
     RegistryEntry,
 )
-from homeassistant.helpers.event import Event
+from homeassistant.helpers.event import Event, async_track_point_in_utc_time
 from homeassistant.util import dt as dt_util, ensure_unique_string, slugify
 from homeassistant.util.async_ import run_callback_threadsafe
 
@@ -117,6 +117,14 @@ class Entity(ABC):
     _context: Optional[Context] = None
     _context_set: Optional[datetime] = None
 
+    # What was last written to the state machine
+    _written_fingerprint: Optional[Tuple] = None
+    _written_state: Optional[State] = None
+
+    # Coalescing of state writes within the state write interval
+    _last_write: Optional[datetime] = None
+    _coalesced_write_unsub: Optional[CALLBACK_TYPE] = None
+
     @property
     def should_poll(self) -> bool:
         """Return True if entity has to be polled for state.
@@ -226,6 +234,15 @@ class Entity(ABC):
         """Time that a context is considered recent."""
         return timedelta(seconds=5)
 
+    @property
+    def state_write_interval(self) -> Optional[timedelta]:
+        """Return the minimum time between two writes of the state.
+
+        The writes requested during the interval are coalesced into one
+        write of the latest state at the end of the interval.
+        """
+        return None
+
     @property
     def entity_registry_enabled_default(self) -> bool:
         """Return if the entity should be enabled when first added to the entity registry."""
@@ -303,48 +320,45 @@ class Entity(ABC):
                 )
             return
 
+        write_interval = self.state_write_interval
+        if write_interval is not None:
+            if self._coalesced_write_unsub is not None:
+                # The scheduled write will write the latest state
+                return
+
+            now = dt_util.utcnow()
+            if self._last_write is not None:
+                next_write = self._last_write + write_interval
+                if next_write > now:
+                    assert self.hass is not None
+                    self._coalesced_write_unsub = async_track_point_in_utc_time(
+                        self.hass, self._async_write_coalesced_ha_state, next_write
+                    )
+                    return
+            self._last_write = now
+
         start = timer()
 
-        attr = self.capability_attributes
-        attr = dict(attr) if attr else {}
+        capability_attr = self.capability_attributes
+        state_attr = device_state_attr = None
 
         if not self.available:
             state = STATE_UNAVAILABLE
         else:
             sstate = self.state
             state = STATE_UNKNOWN if sstate is None else str(sstate)
-            attr.update(self.state_attributes or {})
-            attr.update(self.device_state_attributes or {})
+            state_attr = self.state_attributes
+            device_state_attr = self.device_state_attributes
 
         unit_of_measurement = self.unit_of_measurement
-        if unit_of_measurement is not None:
-            attr[ATTR_UNIT_OF_MEASUREMENT] = unit_of_measurement
-
         entry = self.registry_entry
         # pylint: disable=consider-using-ternary
         name = (entry and entry.name) or self.name
-        if name is not None:
-            attr[ATTR_FRIENDLY_NAME] = name
-
         icon = (entry and entry.icon) or self.icon
-        if icon is not None:
-            attr[ATTR_ICON] = icon
-
         entity_picture = self.entity_picture
-        if entity_picture is not None:
-            attr[ATTR_ENTITY_PICTURE] = entity_picture
-
         assumed_state = self.assumed_state
-        if assumed_state:
-            attr[ATTR_ASSUMED_STATE] = assumed_state
-
         supported_features = self.supported_features
-        if supported_features is not None:
-            attr[ATTR_SUPPORTED_FEATURES] = supported_features
-
         device_class = self.device_class
-        if device_class is not None:
-            attr[ATTR_DEVICE_CLASS] = str(device_class)
 
         end = timer()
 
@@ -371,15 +385,67 @@ class Entity(ABC):
                 extra,
             )
 
-        # Overwrite properties that have been set in the config file.
         assert self.hass is not None
-        if DATA_CUSTOMIZE in self.hass.data:
-            attr.update(self.hass.data[DATA_CUSTOMIZE].get(self.entity_id))
+        customize = self.hass.data.get(DATA_CUSTOMIZE)
+        units = self.hass.config.units
+
+        # Everything the written state is made of, if nothing changed since
+        # the last write there is no need to build the attributes again.
+        fingerprint = (
+            state,
+            capability_attr,
+            state_attr,
+            device_state_attr,
+            unit_of_measurement,
+            name,
+            icon,
+            entity_picture,
+            assumed_state,
+            supported_features,
+            device_class,
+            customize,
+            units,
+        )
+        if (
+            fingerprint == self._written_fingerprint
+            and not self.force_update
+            # The state could have been changed or removed by someone else
+            and self.hass.states.get(self.entity_id) is self._written_state
+        ):
+            return
+
+        attr = dict(capability_attr) if capability_attr else {}
+        attr.update(state_attr or {})
+        attr.update(device_state_attr or {})
+
+        if unit_of_measurement is not None:
+            attr[ATTR_UNIT_OF_MEASUREMENT] = unit_of_measurement
+
+        if name is not None:
+            attr[ATTR_FRIENDLY_NAME] = name
+
+        if icon is not None:
+            attr[ATTR_ICON] = icon
+
+        if entity_picture is not None:
+            attr[ATTR_ENTITY_PICTURE] = entity_picture
+
+        if assumed_state:
+            attr[ATTR_ASSUMED_STATE] = assumed_state
+
+        if supported_features is not None:
+            attr[ATTR_SUPPORTED_FEATURES] = supported_features
+
+        if device_class is not None:
+            attr[ATTR_DEVICE_CLASS] = str(device_class)
+
+        # Overwrite properties that have been set in the config file.
+        if customize is not None:
+            attr.update(customize.get(self.entity_id))
 
         # Convert temperature if we detect one
         try:
             unit_of_measure = attr.get(ATTR_UNIT_OF_MEASUREMENT)
-            units = self.hass.config.units
             if (
                 unit_of_measure in (TEMP_CELSIUS, TEMP_FAHRENHEIT)
                 and unit_of_measure != units.temperature_unit
@@ -403,6 +469,21 @@ class Entity(ABC):
             self.entity_id, state, attr, self.force_update, self._context
         )
 
+        # Entities can return the same attribute dicts after changing them,
+        # keep copies to compare the next write with.
+        self._written_fingerprint = tuple(
+            dict(value) if isinstance(value, Mapping) else value
+            for value in fingerprint
+        )
+        self._written_state = self.hass.states.get(self.entity_id)
+
+    @callback
+    def _async_write_coalesced_ha_state(self, _: datetime) -> None:
+        """Write the latest state at the end of the state write interval."""
+        self._coalesced_write_unsub = None
+        self._last_write = None
+        self._async_write_ha_state()
+
     def schedule_update_ha_state(self, force_refresh: bool = False) -> None:
         """Schedule an update ha state change task.
 
@@ -493,6 +574,10 @@ class Entity(ABC):
             while self._on_remove:
                 self._on_remove.pop()()
 
+        if self._coalesced_write_unsub is not None:
+            self._coalesced_write_unsub()
+            self._coalesced_write_unsub = None
+
         await self.async_internal_will_remove_from_hass()
         await self.async_will_remove_from_hass()
 
@@ -3,18 +3,23 @@ import asyncio
 from contextvars import ContextVar
 from datetime import datetime, timedelta
 from logging import Logger
+import random
+from time import monotonic
 from types import ModuleType
-from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
+
+import attr
 
 from homeassistant.const import DEVICE_DEFAULT_NAME
 from homeassistant.core import CALLBACK_TYPE, callback, split_entity_id, valid_entity_id
 from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
 from homeassistant.helpers import config_validation as cv, service
 from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
 from homeassistant.util.async_ import run_callback_threadsafe
 
 from .entity_registry import DISABLED_INTEGRATION
-from .event import async_call_later, async_track_time_interval
+from .event import async_call_later, async_track_point_in_utc_time
 
 if TYPE_CHECKING:
     from .entity import Entity
@@ -26,6 +31,27 @@ SLOW_SETUP_MAX_WAIT = 60
 PLATFORM_NOT_READY_RETRIES = 10
 DATA_ENTITY_PLATFORM = "entity_platform"
 
+# The first polling round of a platform starts up to this much before the
+# end of the scan interval, so platforms set up together don't poll together
+POLLING_MAX_JITTER = timedelta(milliseconds=500)
+# Most rounds a failing or slow entity is skipped for
+POLLING_MAX_BACKOFF_ROUNDS = 16
+
+
+@attr.s(slots=True)
+class PollingStats:
+    """Statistics of the polling of the entities of a platform."""
+
+    rounds = attr.ib(type=int, default=0)
+    # Rounds that found entities still updating from a previous round
+    overruns = attr.ib(type=int, default=0)
+    updates = attr.ib(type=int, default=0)
+    failed_updates = attr.ib(type=int, default=0)
+    # Updates skipped because the entity was backing off
+    skipped_updates = attr.ib(type=int, default=0)
+    last_round_duration = attr.ib(type=float, default=0.0)
+    max_update_duration = attr.ib(type=float, default=0.0)
+
 
 class EntityPlatform:
     """Manage the entities for a single platform."""
@@ -56,7 +82,17 @@ class EntityPlatform:
         self._async_unsub_polling: Optional[CALLBACK_TYPE] = None
         # Method to cancel the retry of setup
         self._async_cancel_retry_setup: Optional[CALLBACK_TYPE] = None
-        self._process_updates: Optional[asyncio.Lock] = None
+        # Polling
+        self.polling_stats = PollingStats()
+        self._polling_jitter = timedelta(
+            seconds=random.uniform(
+                0, min(POLLING_MAX_JITTER, scan_interval / 10).total_seconds(),
+            )
+        )
+        # Entity ids of the entities being updated by polling
+        self._polling_updates: Set[str] = set()
+        # Entity id -> consecutive failed or slow updates, rounds left to skip
+        self._polling_backoff: Dict[str, List[int]] = {}
 
         self.parallel_updates: Optional[asyncio.Semaphore] = None
 
@@ -296,8 +332,9 @@ class EntityPlatform:
         ):
             return
 
-        self._async_unsub_polling = async_track_time_interval(
-            self.hass, self._update_entity_states, self.scan_interval,
+        # Only the first round is moved, the next ones keep the offset
+        self._async_schedule_polling(
+            dt_util.utcnow() + self.scan_interval - self._polling_jitter
         )
 
     async def _async_add_entity(
@@ -469,6 +506,7 @@ class EntityPlatform:
         if self._async_unsub_polling is not None:
             self._async_unsub_polling()
             self._async_unsub_polling = None
+        self._polling_backoff.clear()
 
     async def async_destroy(self) -> None:
         """Destroy an entity platform.
@@ -526,34 +564,105 @@ class EntityPlatform:
             self.platform_name, name, handle_service, schema
         )
 
+    @callback
+    def _async_schedule_polling(self, point_in_time: datetime) -> None:
+        """Schedule the next polling round."""
+        self._async_unsub_polling = async_track_point_in_utc_time(
+            self.hass, self._async_handle_polling, point_in_time
+        )
+
+    @callback
+    def _async_handle_polling(self, now: datetime) -> None:
+        """Start a polling round and schedule the next one."""
+        self._async_schedule_polling(dt_util.utcnow() + self.scan_interval)
+        self.hass.async_create_task(self._update_entity_states(now))
+
     async def _update_entity_states(self, now: datetime) -> None:
         """Update the states of all the polling entities.
 
         To protect from flooding the executor, we will update async entities
         in parallel and other entities sequential.
 
+        Entities still updating from a previous round are skipped, entities
+        with failing or slow updates are skipped for an increasing number
+        of rounds.
+
         This method must be run in the event loop.
         """
-        if self._process_updates is None:
-            self._process_updates = asyncio.Lock()
-        if self._process_updates.locked():
+        stats = self.polling_stats
+        stats.rounds += 1
+        overrun = False
+        tasks = []
+
+        for entity in list(self.entities.values()):
+            if not entity.should_poll:
+                continue
+
+            entity_id = entity.entity_id
+            if entity_id in self._polling_updates:
+                overrun = True
+                self._async_polling_backoff(entity_id)
+                continue
+
+            backoff = self._polling_backoff.get(entity_id)
+            if backoff is not None and backoff[1] > 0:
+                backoff[1] -= 1
+                stats.skipped_updates += 1
+                continue
+
+            tasks.append(self._async_poll_entity(entity))
+
+        if overrun:
+            stats.overruns += 1
             self.logger.warning(
                 "Updating %s %s took longer than the scheduled update interval %s",
                 self.platform_name,
                 self.domain,
                 self.scan_interval,
             )
+
+        if not tasks:
             return
 
-        async with self._process_updates:
-            tasks = []
-            for entity in self.entities.values():
-                if not entity.should_poll:
-                    continue
-                tasks.append(entity.async_update_ha_state(True))
+        start = monotonic()
+        await asyncio.gather(*tasks)
+        stats.last_round_duration = monotonic() - start
 
-            if tasks:
-                await asyncio.gather(*tasks)
+    async def _async_poll_entity(self, entity: "Entity") -> None:
+        """Update a polling entity and write its state."""
+        entity_id = entity.entity_id
+        stats = self.polling_stats
+        self._polling_updates.add(entity_id)
+        start = monotonic()
+
+        try:
+            await entity.async_device_update()
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception("Update for %s fails", entity_id)
+            stats.failed_updates += 1
+            self._async_polling_backoff(entity_id)
+            return
+        finally:
+            self._polling_updates.discard(entity_id)
+            duration = monotonic() - start
+            stats.updates += 1
+            stats.max_update_duration = max(stats.max_update_duration, duration)
+
+        if duration > self.scan_interval.total_seconds():
+            self._async_polling_backoff(entity_id)
+        else:
+            self._polling_backoff.pop(entity_id, None)
+
+        # The entity can be removed while it was updating
+        if entity.hass is not None:
+            entity.async_write_ha_state()
+
+    @callback
+    def _async_polling_backoff(self, entity_id: str) -> None:
+        """Skip the next polling rounds for a failing or slow entity."""
+        backoff = self._polling_backoff.setdefault(entity_id, [0, 0])
+        backoff[0] += 1
+        backoff[1] = min(2 ** (backoff[0] - 1), POLLING_MAX_BACKOFF_ROUNDS)
 
 
 current_platform: ContextVar[Optional[EntityPlatform]] = ContextVar(
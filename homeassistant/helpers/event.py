@@ -1,7 +1,23 @@
 """Helpers for listening to events."""
+import asyncio
 from datetime import datetime, timedelta
 import functools as ft
-from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union, cast
+import heapq
+from itertools import count
+import logging
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 import attr
 
@@ -15,12 +31,20 @@ from homeassistant.const import (
     SUN_EVENT_SUNSET,
 )
 from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.sun import get_astral_event_next
-from homeassistant.helpers.template import Template
+from homeassistant.helpers.template import RenderInfo, Template
 from homeassistant.loader import bind_hass
 from homeassistant.util import dt as dt_util
 from homeassistant.util.async_ import run_callback_threadsafe
 
+TRACK_STATE_CHANGE_CALLBACKS = "track_state_change_callbacks"
+TRACK_STATE_CHANGE_LISTENER = "track_state_change_listener"
+DATA_POINT_IN_TIME_SCHEDULER = "point_in_time_scheduler"
+DATA_CLOCK_ROLLBACK_DETECTOR = "clock_rollback_detector"
+
+_LOGGER = logging.getLogger(__name__)
+
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
@@ -81,12 +105,6 @@ def async_track_state_change(
     @callback
     def state_change_listener(event: Event) -> None:
         """Handle specific state changes."""
-        if (
-            entity_ids != MATCH_ALL
-            and cast(str, event.data.get("entity_id")) not in entity_ids
-        ):
-            return
-
         old_state = event.data.get("old_state")
         if old_state is not None:
             old_state = old_state.state
@@ -103,12 +121,79 @@ def async_track_state_change(
                 event.data.get("new_state"),
             )
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    if entity_ids == MATCH_ALL:
+        return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+
+    return _async_track_state_change_event(hass, entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
 
 
+@callback
+def _async_track_state_change_event(
+    hass: HomeAssistant, entity_ids: Iterable[str], action: Callable[[Event], None],
+) -> CALLBACK_TYPE:
+    """Call action with the state changed events of entity_ids.
+
+    The trackers share a single state changed listener that only calls the
+    actions tracking the entity of the event.
+    """
+    entity_callbacks = hass.data.setdefault(TRACK_STATE_CHANGE_CALLBACKS, {})
+
+    if TRACK_STATE_CHANGE_LISTENER not in hass.data:
+
+        @callback
+        def _async_state_change_filter(event: Event) -> bool:
+            """Filter state changes of entities that are not tracked."""
+            return event.data.get("entity_id") in entity_callbacks
+
+        @callback
+        def _async_state_change_dispatcher(event: Event) -> None:
+            """Dispatch state changes by entity_id."""
+            entity_id = event.data.get("entity_id")
+
+            # Trackers might have been removed since the event was filtered
+            if entity_id not in entity_callbacks:
+                return
+
+            # Copy as the actions can remove trackers
+            for job in entity_callbacks[entity_id][:]:
+                try:
+                    hass.async_run_job(job, event)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "Error while processing state changed for %s", entity_id
+                    )
+
+        hass.data[TRACK_STATE_CHANGE_LISTENER] = hass.bus.async_listen(
+            EVENT_STATE_CHANGED,
+            _async_state_change_dispatcher,
+            event_filter=_async_state_change_filter,
+        )
+
+    entity_ids = set(entity_ids)
+    for entity_id in entity_ids:
+        entity_callbacks.setdefault(entity_id, []).append(action)
+
+    @callback
+    def remove_listener() -> None:
+        """Remove state change listener."""
+        for entity_id in entity_ids:
+            callbacks = entity_callbacks.get(entity_id)
+            if callbacks is None or action not in callbacks:
+                _LOGGER.warning("Unable to remove unknown state change listener")
+                return
+            callbacks.remove(action)
+            if not callbacks:
+                del entity_callbacks[entity_id]
+
+        if not entity_callbacks:
+            hass.data.pop(TRACK_STATE_CHANGE_LISTENER)()
+
+    return remove_listener
+
+
 @callback
 @bind_hass
 def async_track_template(
@@ -117,33 +202,111 @@ def async_track_template(
     action: Callable[[str, State, State], None],
     variables: Optional[Dict[str, Any]] = None,
 ) -> CALLBACK_TYPE:
-    """Add a listener that track state changes with template condition."""
-    from . import condition  # pylint: disable=import-outside-toplevel
+    """Add a listener that track state changes with template condition.
+
+    The template is only rendered again when a state used by its last render
+    changes, or when an entity is added to or removed from a domain the last
+    render iterated over. A render that used no states is rendered again on
+    any state change.
+    """
+    # Static templates can't change, there is nothing to track
+    if template.is_static:
+        return lambda: None
+
+    if template.hass is None:
+        template.hass = hass
 
     # Local variable to keep track of if the action has already been triggered
     already_triggered = False
+    info = template.async_render_to_info(variables)
+    unsub: Optional[CALLBACK_TYPE] = None
 
     @callback
-    def template_condition_listener(entity_id: str, from_s: State, to_s: State) -> None:
+    def template_condition_listener(event: Event) -> None:
         """Check if condition is correct and run action."""
-        nonlocal already_triggered
-        template_result = condition.async_template(hass, template, variables)
+        nonlocal already_triggered, info, unsub
+
+        # The tracker might have been removed while the event was dispatched
+        if unsub is None:
+            return
+
+        last_info = info
+        info = template.async_render_to_info(variables)
+        if _render_info_dependencies(info) != _render_info_dependencies(last_info):
+            unsub()
+            unsub = _async_track_render_info(hass, info, template_condition_listener)
+
+        try:
+            template_result = info.result.lower() == "true"
+        except TemplateError as ex:
+            _LOGGER.error("Error during template condition: %s", ex)
+            template_result = False
 
         # Check to see if template returns true
         if template_result and not already_triggered:
             already_triggered = True
-            hass.async_run_job(action, entity_id, from_s, to_s)
+            hass.async_run_job(
+                action,
+                event.data.get("entity_id"),
+                event.data.get("old_state"),
+                event.data.get("new_state"),
+            )
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(variables), template_condition_listener
-    )
+    unsub = _async_track_render_info(hass, info, template_condition_listener)
+
+    @callback
+    def remove_listener() -> None:
+        """Remove template listener."""
+        nonlocal unsub
+        if unsub is not None:
+            unsub()
+            unsub = None
+
+    return remove_listener
 
 
 track_template = threaded_listener_factory(async_track_template)
 
 
+def _render_info_dependencies(
+    info: RenderInfo,
+) -> Tuple[bool, FrozenSet[str], FrozenSet[str]]:
+    """Return the states a template render depends on."""
+    return (info.all_states, info.domains, info.entities)
+
+
+@callback
+def _async_track_render_info(
+    hass: HomeAssistant, info: RenderInfo, action: Callable[[Event], None]
+) -> CALLBACK_TYPE:
+    """Call action with the state changed events that can change a render."""
+    if not info.all_states and not info.domains:
+        if info.entities:
+            return _async_track_state_change_event(hass, info.entities, action)
+        # The render used no states, any state change might change it
+        return hass.bus.async_listen(EVENT_STATE_CHANGED, action)
+
+    @callback
+    def _async_render_info_filter(event: Event) -> bool:
+        """Filter state changes that cannot change the render."""
+        entity_id = event.data.get("entity_id")
+        if info.filter(entity_id):
+            return True
+        # Iterating a domain only depends on the entities it contains
+        if (
+            event.data.get("old_state") is not None
+            and event.data.get("new_state") is not None
+        ):
+            return False
+        return info.filter_lifecycle(entity_id)
+
+    return hass.bus.async_listen(
+        EVENT_STATE_CHANGED, action, event_filter=_async_render_info_filter
+    )
+
+
 @callback
 @bind_hass
 def async_track_same_state(
@@ -228,33 +391,200 @@ def async_track_point_in_utc_time(
     hass: HomeAssistant, action: Callable[..., Any], point_in_time: datetime
 ) -> CALLBACK_TYPE:
     """Add a listener that fires once after a specific point in UTC time."""
+    scheduler = hass.data.get(DATA_POINT_IN_TIME_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_POINT_IN_TIME_SCHEDULER] = _PointInTimeScheduler(
+            hass
+        )
+
     # Ensure point_in_time is UTC
-    point_in_time = dt_util.as_utc(point_in_time)
+    return scheduler.async_schedule(action, dt_util.as_utc(point_in_time))
+
+
+track_point_in_utc_time = threaded_listener_factory(async_track_point_in_utc_time)
+
+
+class _PointInTimeScheduler:
+    """Run the point in time listeners from a heap of their deadlines.
+
+    The earliest deadline in the future is armed on the event loop, so a
+    pending listener costs nothing until it is due and runs at its point
+    in time. While listeners are pending, the time changed events also run
+    the ones that are due. This covers the points in time that have passed
+    already when they are added, and clocks that are set.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        # Entries are [point_in_time, sequence, action], the action
+        # is set to None once it ran or was cancelled
+        self._heap: List[List[Any]] = []
+        self._sequence = count()
+        self._pending = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._handle_point_in_time: Optional[datetime] = None
+        self._unsub_time_changed: Optional[CALLBACK_TYPE] = None
 
     @callback
-    def point_in_time_listener(event: Event) -> None:
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
+    def async_schedule(
+        self, action: Callable[..., Any], point_in_time: datetime
+    ) -> CALLBACK_TYPE:
+        """Schedule action to run at point_in_time and return a cancel callback."""
+        entry = [point_in_time, next(self._sequence), action]
+        heapq.heappush(self._heap, entry)
+        self._pending += 1
+
+        if self._unsub_time_changed is None:
+            self._unsub_time_changed = self.hass.bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_time_changed
+            )
+        self._async_arm()
+
+        @callback
+        def async_cancel() -> None:
+            """Cancel the listener if it did not run yet."""
+            if entry[2] is None:
+                return
+            entry[2] = None
+            self._async_entry_done()
+
+        return async_cancel
 
-        if now < point_in_time or hasattr(point_in_time_listener, "run"):
+    @callback
+    def _async_entry_done(self) -> None:
+        """Stop listening when no listener is pending anymore."""
+        self._pending -= 1
+        if self._pending:
             return
 
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        setattr(point_in_time_listener, "run", True)
-        async_unsub()
+        # Only cancelled entries are left
+        self._heap.clear()
+        if self._unsub_time_changed is not None:
+            self._unsub_time_changed()
+            self._unsub_time_changed = None
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
 
-        hass.async_run_job(action, now)
+    @callback
+    def _async_arm(self) -> None:
+        """Arm the loop timer for the earliest deadline."""
+        point_in_time = self._heap[0][0]
+        if self._handle is not None:
+            if cast(datetime, self._handle_point_in_time) <= point_in_time:
+                return
+            self._handle.cancel()
+            self._handle = None
+
+        delay = (point_in_time - dt_util.utcnow()).total_seconds()
+        if delay <= 0:
+            # Already due, the next time changed event runs it
+            return
+
+        self._handle_point_in_time = point_in_time
+        self._handle = self.hass.loop.call_later(delay, self._async_timer_fired)
+
+    @callback
+    def _async_timer_fired(self) -> None:
+        """Run the listeners due when the loop timer fires."""
+        self._handle = None
+        self.async_run_due(dt_util.utcnow())
 
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED, point_in_time_listener)
+    @callback
+    def _async_time_changed(self, event: Event) -> None:
+        """Run the listeners due at a time changed event."""
+        self.async_run_due(_time_changed_now(event))
 
-    return async_unsub
+    @callback
+    def async_run_due(self, now: datetime) -> None:
+        """Run the listeners that are due at now."""
+        heap = self._heap
+        # Listeners scheduled by the actions run at the earliest
+        # at the next call
+        due = []
+        while heap and heap[0][0] <= now:
+            due.append(heapq.heappop(heap))
+
+        for entry in due:
+            action = entry[2]
+            # Cancelled before or by one of the actions
+            if action is None:
+                continue
+            entry[2] = None
+            self._async_entry_done()
+            try:
+                self.hass.async_run_job(action, now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running point in time listener %s", action)
+
+        if self._pending:
+            self._async_arm()
+
+
+class _ClockRollbackDetector:
+    """Detect the time going backwards for the time pattern listeners.
+
+    The pattern listeners only wake up at their next matching time, this
+    shared detector tells them to compute it again when the clock is set
+    back.
+    """
 
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the detector."""
+        self.hass = hass
+        self._callbacks: List[Callable[[datetime], None]] = []
+        self._last_now: Optional[datetime] = None
+        self._unsub_time_changed: Optional[CALLBACK_TYPE] = None
 
-track_point_in_utc_time = threaded_listener_factory(async_track_point_in_utc_time)
+    @callback
+    def async_add(
+        self, rolled_back: Callable[[datetime], None], now: datetime
+    ) -> CALLBACK_TYPE:
+        """Call rolled_back when the time goes back before now or later times."""
+        self._callbacks.append(rolled_back)
+        if self._last_now is None or self._last_now < now:
+            self._last_now = now
+
+        if self._unsub_time_changed is None:
+            self._unsub_time_changed = self.hass.bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_time_changed
+            )
+
+        @callback
+        def async_remove() -> None:
+            """Remove the callback."""
+            if rolled_back not in self._callbacks:
+                return
+            self._callbacks.remove(rolled_back)
+            if self._callbacks:
+                return
+            cast(CALLBACK_TYPE, self._unsub_time_changed)()
+            self._unsub_time_changed = None
+            self._last_now = None
+
+        return async_remove
+
+    @callback
+    def _async_time_changed(self, event: Event) -> None:
+        """Check if the time rolled back."""
+        now = _time_changed_now(event)
+        last_now = self._last_now
+        self._last_now = now
+        if last_now is None or now >= last_now:
+            return
+
+        # Copy as the callbacks can add and remove listeners
+        for rolled_back in self._callbacks[:]:
+            rolled_back(now)
+
+
+def _time_changed_now(event: Event) -> datetime:
+    """Return the time of a time changed event, naive times are UTC."""
+    now: datetime = event.data[ATTR_NOW]
+    if now.tzinfo is None:
+        return now.replace(tzinfo=dt_util.UTC)
+    return now
 
 
 @callback
@@ -418,42 +748,56 @@ def async_track_utc_time_change(
     matching_minutes = dt_util.parse_time_expression(minute, 0, 59)
     matching_hours = dt_util.parse_time_expression(hour, 0, 23)
 
-    next_time = None
-
-    def calculate_next(now: datetime) -> None:
-        """Calculate and set the next time the trigger should fire."""
-        nonlocal next_time
-
+    def calculate_next(now: datetime) -> datetime:
+        """Calculate the next time the trigger should fire."""
         localized_now = dt_util.as_local(now) if local else now
-        next_time = dt_util.find_next_time_expression_time(
+        return dt_util.find_next_time_expression_time(
             localized_now, matching_seconds, matching_minutes, matching_hours
         )
 
-    # Make sure rolling back the clock doesn't prevent the timer from
-    # triggering.
-    last_now: Optional[datetime] = None
-
     @callback
-    def pattern_time_change_listener(event: Event) -> None:
-        """Listen for matching time_changed events."""
-        nonlocal next_time, last_now
+    def pattern_time_change_listener(now: datetime) -> None:
+        """Run the action and wait for the next matching time."""
+        nonlocal cancel_callback
+        cancel_callback = async_track_point_in_utc_time(
+            hass,
+            pattern_time_change_listener,
+            calculate_next(now + timedelta(seconds=1)),
+        )
+        hass.async_run_job(action, dt_util.as_local(now) if local else now)
 
-        now = event.data[ATTR_NOW]
+    @callback
+    def clock_rolled_back(now: datetime) -> None:
+        """Wait for the next matching time from the new time."""
+        nonlocal cancel_callback
+        cancel_callback()
+        next_time = calculate_next(now)
+        if next_time <= now:
+            pattern_time_change_listener(now)
+        else:
+            cancel_callback = async_track_point_in_utc_time(
+                hass, pattern_time_change_listener, next_time
+            )
 
-        if last_now is None or now < last_now:
-            # Time rolled back or next time not yet calculated
-            calculate_next(now)
+    detector = hass.data.get(DATA_CLOCK_ROLLBACK_DETECTOR)
+    if detector is None:
+        detector = hass.data[DATA_CLOCK_ROLLBACK_DETECTOR] = _ClockRollbackDetector(
+            hass
+        )
 
-        last_now = now
+    now = dt_util.utcnow()
+    cancel_callback = async_track_point_in_utc_time(
+        hass, pattern_time_change_listener, calculate_next(now)
+    )
+    remove_rolled_back = detector.async_add(clock_rolled_back, now)
 
-        if next_time <= now:
-            hass.async_run_job(action, dt_util.as_local(now) if local else now)
-            calculate_next(now + timedelta(seconds=1))
+    @callback
+    def unsub_pattern_time_change_listener() -> None:
+        """Remove the time pattern listener."""
+        cancel_callback()
+        remove_rolled_back()
 
-    # We can't use async_track_point_in_utc_time here because it would
-    # break in the case that the system time abruptly jumps backwards.
-    # Our custom last_now logic takes care of resolving that scenario.
-    return hass.bus.async_listen(EVENT_TIME_CHANGED, pattern_time_change_listener)
+    return unsub_pattern_time_change_listener
 
 
 track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
@@ -8,7 +8,7 @@ import logging
 import math
 import random
 import re
-from typing import Any, Dict, Iterable, List, Optional, Union
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Union
 
 import jinja2
 from jinja2 import contextfilter, contextfunction
@@ -146,6 +146,21 @@ class RenderInfo:
             or entity_id in self._entities
         )
 
+    @property
+    def all_states(self) -> bool:
+        """Return if the render iterated over all states."""
+        return self._all_states
+
+    @property
+    def domains(self) -> FrozenSet[str]:
+        """Return the domains the render iterated over."""
+        return getattr(self, "_domains", frozenset())
+
+    @property
+    def entities(self) -> FrozenSet[str]:
+        """Return the entities whose state the render used."""
+        return frozenset(self._entities)
+
     @property
     def result(self) -> str:
         """Results of the template computation."""
@@ -198,6 +213,11 @@ class Template:
         except jinja2.exceptions.TemplateSyntaxError as err:
             raise TemplateError(err)
 
+    @property
+    def is_static(self) -> bool:
+        """Return if the template renders the same without Jinja code."""
+        return _RE_JINJA_DELIMITERS.search(self.template) is None
+
     def extract_entities(
         self, variables: Optional[Dict[str, Any]] = None
     ) -> Union[str, List[str]]:
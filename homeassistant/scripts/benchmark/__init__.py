@@ -11,7 +11,12 @@ from typing import Callable, Dict, TypeVar
 
 from homeassistant import core
 from homeassistant.components.websocket_api.const import JSON_DUMP
-from homeassistant.const import ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED
+from homeassistant.const import (
+    ATTR_NOW,
+    EVENT_STATE_CHANGED,
+    EVENT_TIME_CHANGED,
+    MATCH_ALL,
+)
 from homeassistant.helpers.entityfilter import convert_include_exclude_filter
 from homeassistant.helpers.json import JSONEncoder
 from homeassistant.util import dt as dt_util
@@ -84,6 +89,40 @@ async def fire_events(hass):
     return timer() - start
 
 
+@benchmark
+async def fire_events_match_all(hass):
+    """Fire a million events of different types with a MATCH_ALL listener."""
+    count = 0
+    event_names = [f"benchmark_event_{idx}" for idx in range(10)]
+    event = asyncio.Event()
+
+    @core.callback
+    def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == 2 * 10 ** 6:
+            event.set()
+
+    hass.bus.async_listen(MATCH_ALL, listener)
+    for event_name in event_names:
+        hass.bus.async_listen(event_name, listener)
+
+    start = timer()
+
+    # Let the loop catch up regularly so we measure the dispatching
+    # and not the garbage collector going through a million handles
+    for idx in range(10 ** 6):
+        hass.bus.async_fire(event_names[idx % 10])
+        if idx % 1000 == 999:
+            await asyncio.sleep(0)
+
+    await event.wait()
+
+    return timer() - start
+
+
 @benchmark
 async def time_changed_helper(hass):
     """Run a million events through time changed helper."""
@@ -305,6 +344,7 @@ def _create_state_changed_event_from_old_new(
             "entity_id"
             "domain"
             "attributes"
+            "shared_attrs"
             "state_id",
             "old_state_id",
         ],
@@ -313,6 +353,7 @@ def _create_state_changed_event_from_old_new(
     row.event_type = EVENT_STATE_CHANGED
     row.event_data = "{}"
     row.attributes = attributes_json
+    row.shared_attrs = None
     row.time_fired = event_time_fired
     row.state = new_state and new_state.get("state")
     row.entity_id = entity_id
@@ -0,0 +1,36 @@
+"""Read only dictionary."""
+import copy
+from typing import Any, Dict, TypeVar
+
+# pylint: disable=invalid-name
+_KT = TypeVar("_KT")
+_VT = TypeVar("_VT")
+# pylint: enable=invalid-name
+
+
+def _readonly(*args: Any, **kwargs: Any) -> Any:
+    """Raise an exception when a read only dict is modified."""
+    raise RuntimeError("Cannot modify ReadOnlyDict")
+
+
+class ReadOnlyDict(Dict[_KT, _VT]):
+    """Read only version of dict that is compatible with dict types.
+
+    Used for values that are cached and shared between callers.
+    """
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    pop = _readonly
+    popitem = _readonly
+    clear = _readonly
+    update = _readonly
+    setdefault = _readonly
+
+    def __copy__(self) -> Dict[_KT, _VT]:
+        """Return a modifiable copy."""
+        return dict(self)
+
+    def __deepcopy__(self, memo: Any) -> Dict[_KT, _VT]:
+        """Return a modifiable deep copy."""
+        return copy.deepcopy(dict(self), memo)
@@ -0,0 +1,19 @@
+"""Helpers to generate ulids."""
+from random import getrandbits
+import time
+
+
+def ulid_hex() -> str:
+    """Generate a ULID in hex that will work for a UUID.
+
+    This ulid should not be used for cryptographically secure operations.
+
+     01AN4Z07BY      79KA1307SR9X4MV3
+    |----------|    |----------------|
+     Timestamp          Randomness
+       48bits             80bits
+
+    The hex string has the length of a uuid4 hex. As it starts with the
+    timestamp in milliseconds, ids created later sort after earlier ones.
+    """
+    return f"{int(time.time() * 1000):012x}{getrandbits(80):020x}"
@@ -52,6 +52,7 @@ from homeassistant.helpers import (
     restore_state,
     storage,
 )
+from homeassistant.helpers.event import DATA_POINT_IN_TIME_SCHEDULER
 from homeassistant.helpers.json import JSONEncoder
 from homeassistant.setup import setup_component
 from homeassistant.util.async_ import run_callback_threadsafe
@@ -286,7 +287,14 @@ fire_mqtt_message = threadsafe_callback_factory(async_fire_mqtt_message)
 @ha.callback
 def async_fire_time_changed(hass, time):
     """Fire a time changes event."""
-    hass.bus.async_fire(EVENT_TIME_CHANGED, {"now": date_util.as_utc(time)})
+    time = date_util.as_utc(time)
+    hass.bus.async_fire(EVENT_TIME_CHANGED, {"now": time})
+
+    # Run the point in time listeners that are due right away,
+    # as their loop timer would
+    scheduler = hass.data.get(DATA_POINT_IN_TIME_SCHEDULER)
+    if scheduler is not None:
+        scheduler.async_run_due(time)
 
 
 fire_time_changed = threadsafe_callback_factory(async_fire_time_changed)
@@ -787,7 +795,7 @@ def mock_restore_cache(hass, states):
 
     last_states = {}
     for state in states:
-        restored_state = state.as_dict()
+        restored_state = dict(state.as_dict())
         restored_state["attributes"] = json.loads(
             json.dumps(restored_state["attributes"], cls=JSONEncoder)
         )
@@ -5,7 +5,8 @@ import json
 import unittest
 
 from homeassistant.components import history, recorder
-from homeassistant.components.recorder.models import process_timestamp
+from homeassistant.components.recorder.models import Statistics, process_timestamp
+from homeassistant.components.recorder.util import session_scope
 import homeassistant.core as ha
 from homeassistant.helpers.json import JSONEncoder
 from homeassistant.setup import async_setup_component, setup_component
@@ -17,7 +18,7 @@ from tests.common import (
     init_recorder_component,
     mock_state_change_event,
 )
-from tests.components.recorder.common import wait_recording_done
+from tests.components.recorder.common import trigger_db_commit, wait_recording_done
 
 
 class TestComponentHistory(unittest.TestCase):
@@ -790,3 +791,134 @@ async def test_fetch_period_api_with_include_order(hass, hass_client):
         params={"filter_entity_id": "non.existing,something.else"},
     )
     assert response.status == 200
+
+
+async def test_fetch_period_api_serves_long_periods_from_statistics(hass, hass_client):
+    """Test long periods are served from the statistics when available."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        days=10
+    )
+
+    def _add_statistics():
+        with session_scope(hass=hass) as session:
+            for hour in range(3):
+                session.add(
+                    Statistics(
+                        period="hour",
+                        domain="sensor",
+                        entity_id="sensor.power",
+                        start=start + timedelta(hours=hour),
+                        min=hour,
+                        mean=hour + 0.5,
+                        max=hour + 1,
+                        last=hour + 1,
+                        count=2,
+                    )
+                )
+
+    await hass.async_add_executor_job(_add_statistics)
+    hass.states.async_set("sensor.power", "3", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={
+            "end_time": dt_util.utcnow().isoformat(),
+            "filter_entity_id": "sensor.power",
+        },
+    )
+    assert response.status == 200
+    result = await response.json()
+    assert len(result) == 1
+    assert [state["state"] for state in result[0]] == ["0.5", "1.5", "2.5"]
+    assert result[0][0]["attributes"] == {
+        "unit_of_measurement": "W",
+        "min": 0,
+        "max": 1,
+    }
+
+
+async def test_fetch_period_api_with_stream(hass, hass_client):
+    """Test the fetch period view streams the same history."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow()
+
+    for state in ("on", "off", "off", "on"):
+        hass.states.async_set("light.kitchen", state)
+        hass.states.async_set("sensor.temperature", "20", {"count": state})
+        await hass.async_block_till_done()
+    hass.states.async_set("script.no_cancel", "on")
+    await hass.async_block_till_done()
+    await hass.async_add_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    for params in ({}, {"minimal_response": ""}):
+        response = await client.get(
+            f"/api/history/period/{start.isoformat()}", params=params
+        )
+        assert response.status == 200
+        expected = await response.json()
+
+        with patch.object(history, "STREAM_CHUNK_SIZE", 10):
+            response = await client.get(
+                f"/api/history/period/{start.isoformat()}",
+                params={**params, "stream": ""},
+            )
+        assert response.status == 200
+        assert response.headers["Content-Type"] == "application/json"
+        result = await response.json()
+
+        assert len(result) == 2
+        assert sorted(expected, key=lambda states: states[0]["entity_id"]) == result
+
+
+async def test_fetch_period_api_with_compact(hass, hass_client):
+    """Test the fetch period view in the compact format."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow()
+
+    for state, attributes in (
+        ("20", {"unit_of_measurement": "°C"}),
+        ("21", {"unit_of_measurement": "°C"}),
+        ("22", {"unit_of_measurement": "°F"}),
+    ):
+        hass.states.async_set("sensor.temperature", state, attributes)
+        await hass.async_block_till_done()
+    await hass.async_add_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    states = hass.states.async_all()
+
+    client = await hass_client()
+    for params in ({"compact": ""}, {"compact": "", "stream": ""}):
+        response = await client.get(
+            f"/api/history/period/{start.isoformat()}", params=params
+        )
+        assert response.status == 200
+        result = await response.json()
+
+        assert len(result) == 1
+        compact = result[0]
+        assert compact["entity_id"] == "sensor.temperature"
+        assert compact["s"] == ["20", "21", "22"]
+        assert compact["a"] == [
+            [0, {"unit_of_measurement": "°C"}],
+            [2, {"unit_of_measurement": "°F"}],
+        ]
+        last_updated = compact["lu"][0]
+        assert last_updated >= round(start.timestamp() * 1000)
+        for delta in compact["lu"][1:]:
+            assert delta >= 0
+            last_updated += delta
+        assert last_updated == round(states[0].last_updated.timestamp() * 1000)
@@ -1447,6 +1447,7 @@ class TestComponentLogbook(unittest.TestCase):
                 "entity_id"
                 "domain"
                 "attributes"
+                "shared_attrs"
                 "state_id",
                 "old_state_id",
             ],
@@ -1455,6 +1456,7 @@ class TestComponentLogbook(unittest.TestCase):
         row.event_type = EVENT_STATE_CHANGED
         row.event_data = "{}"
         row.attributes = attributes_json
+        row.shared_attrs = None
         row.time_fired = event_time_fired
         row.state = new_state and new_state.get("state")
         row.entity_id = entity_id
@@ -1789,6 +1791,79 @@ async def test_logbook_entity_filter_with_automations(hass, hass_client):
     assert json_dict[0]["entity_id"] == entity_id_second
 
 
+async def test_logbook_view_limit_before(hass, hass_client):
+    """Test the logbook view pages with limit and before."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    entity_id_test = "switch.test"
+    hass.states.async_set(entity_id_test, STATE_OFF)
+    hass.states.async_set(entity_id_test, STATE_ON)
+    entity_id_second = "switch.second"
+    hass.states.async_set(entity_id_second, STATE_OFF)
+    hass.states.async_set(entity_id_second, STATE_ON)
+    await hass.async_add_job(partial(trigger_db_commit, hass))
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+
+    response = await client.get("/api/logbook", params={"limit": 1})
+    assert response.status == 200
+    response_json = await response.json()
+    assert len(response_json) == 1
+    assert response_json[0]["entity_id"] == entity_id_second
+
+    response = await client.get(
+        "/api/logbook", params={"limit": 1, "before": response_json[0]["when"]}
+    )
+    assert response.status == 200
+    response_json = await response.json()
+    assert len(response_json) == 1
+    assert response_json[0]["entity_id"] == entity_id_test
+
+    response = await client.get(
+        "/api/logbook", params={"limit": 1, "before": response_json[0]["when"]}
+    )
+    assert response.status == 200
+    assert await response.json() == []
+
+    response = await client.get("/api/logbook", params={"limit": 0})
+    assert response.status == 400
+
+
+async def test_logbook_view_excludes_continuous_sensors(hass, hass_client):
+    """Test sensors with a unit are filtered out of the logbook view."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(
+        hass,
+        "logbook",
+        {
+            logbook.DOMAIN: {
+                logbook.CONF_INCLUDE: {CONF_DOMAINS: ["sensor", "switch"]},
+                logbook.CONF_EXCLUDE: {CONF_ENTITIES: ["switch.excluded"]},
+            }
+        },
+    )
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    for state in ("1", "2"):
+        hass.states.async_set("sensor.power", state, {"unit_of_measurement": "W"})
+        hass.states.async_set("sensor.mode", state)
+        hass.states.async_set("switch.excluded", state)
+        hass.states.async_set("light.kitchen", state)
+    await hass.async_add_job(partial(trigger_db_commit, hass))
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    response = await client.get("/api/logbook")
+    assert response.status == 200
+    response_json = await response.json()
+    assert [entry["entity_id"] for entry in response_json] == ["sensor.mode"]
+
+
 class MockLazyEventPartialState(ha.Event):
     """Minimal mock of a Lazy event."""
 
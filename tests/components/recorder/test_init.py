@@ -14,7 +14,13 @@ from homeassistant.components.recorder import (
     run_information_with_session,
 )
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    Statistics,
+)
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import MATCH_ALL
 from homeassistant.core import ATTR_NOW, EVENT_TIME_CHANGED, Context, callback
@@ -127,6 +133,7 @@ def _add_entities(hass, entity_ids):
 
 
 def _add_events(hass, events):
+    wait_recording_done(hass)
     with session_scope(hass=hass) as session:
         session.query(Events).delete(synchronize_session=False)
     for event_type in events:
@@ -273,6 +280,7 @@ def test_recorder_setup_failure():
             hass,
             auto_purge=True,
             keep_days=7,
+            retention=[],
             commit_interval=1,
             uri="sqlite://",
             db_max_retries=10,
@@ -317,7 +325,7 @@ def test_auto_purge(hass_recorder):
     test_time = tz.localize(datetime(2020, 1, 1, 4, 12, 0))
 
     with patch(
-        "homeassistant.components.recorder.purge.purge_old_data"
+        "homeassistant.components.recorder.purge.purge_old_data", return_value=True
     ) as purge_old_data:
         for delta in (-1, 0, 1):
             hass.bus.fire(
@@ -357,6 +365,66 @@ def test_saving_sets_old_state(hass_recorder):
         assert states[3].old_state_id == states[1].state_id
 
 
+def test_saving_sets_old_state_in_same_commit(hass_recorder):
+    """Test saving sets old state for changes flushed in the same commit."""
+    hass = hass_recorder()
+
+    hass.states.set("test.one", "on", {})
+    hass.states.set("test.one", "off", {})
+    hass.states.set("test.one", "on", {})
+    wait_recording_done(hass)
+    hass.states.set("test.one", "off", {})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States))
+        assert len(states) == 4
+        events = {event.event_id for event in session.query(Events)}
+
+        assert states[0].old_state_id is None
+        assert states[1].old_state_id == states[0].state_id
+        assert states[2].old_state_id == states[1].state_id
+        assert states[3].old_state_id == states[2].state_id
+        assert all(state.event_id in events for state in states)
+
+
+def test_saving_state_shares_attributes(hass_recorder):
+    """Test states with the same attributes share the attributes row."""
+    hass = hass_recorder()
+
+    hass.states.set("test.one", "on", {"unit": "W"})
+    hass.states.set("test.one", "off", {"unit": "W"})
+    hass.states.set("test.two", "on", {"unit": "kW"})
+    wait_recording_done(hass)
+    hass.states.set("test.one", "on", {"unit": "W"})
+    hass.states.set("test.two", "off", {"unit": "W"})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 2
+        states = list(session.query(States))
+        assert len(states) == 5
+        assert all(state.attributes is None for state in states)
+        watt_ids = {
+            state.attributes_id
+            for state in states
+            if state.entity_id == "test.one" or state.state == "off"
+        }
+        assert len(watt_ids) == 1
+        kilowatt_state = next(
+            state
+            for state in states
+            if state.entity_id == "test.two" and state.state == "on"
+        )
+        assert kilowatt_state.attributes_id not in watt_ids
+        last_state = next(
+            state
+            for state in states
+            if state.entity_id == "test.two" and state.state == "off"
+        )
+        assert last_state.to_native() == _state_empty_context(hass, "test.two")
+
+
 def test_saving_state_with_serializable_data(hass_recorder, caplog):
     """Test saving data that cannot be serialized does not crash."""
     hass = hass_recorder()
@@ -413,3 +481,58 @@ def test_run_information(hass_recorder):
 
 class CannotSerializeMe:
     """A class that the JSONEncoder cannot serialize."""
+
+
+def test_compiling_statistics(hass_recorder):
+    """Test numeric sensor states are compiled into statistics."""
+    hass = hass_recorder()
+    now = dt_util.utcnow().replace(minute=1, second=0, microsecond=0)
+    attributes = {"unit_of_measurement": "W"}
+
+    with patch("homeassistant.core.dt_util.utcnow", return_value=now):
+        hass.states.set("sensor.power", "10", attributes)
+        hass.states.set("sensor.text", "off", {})
+        hass.states.set("sensor.no_unit", "10", {})
+    with patch(
+        "homeassistant.core.dt_util.utcnow", return_value=now + timedelta(minutes=1)
+    ):
+        hass.states.set("sensor.power", "30", attributes)
+    wait_recording_done(hass)
+    with patch(
+        "homeassistant.core.dt_util.utcnow", return_value=now + timedelta(minutes=5)
+    ):
+        hass.states.set("sensor.power", "unavailable", attributes)
+        hass.states.set("sensor.power", "5", attributes)
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        statistics = {
+            (row.period, row.start.minute): row
+            for row in session.query(Statistics).order_by(Statistics.start)
+        }
+        assert all(row.entity_id == "sensor.power" for row in statistics.values())
+        assert set(statistics) == {
+            ("5minute", 0),
+            ("5minute", 5),
+            ("hour", 0),
+            ("day", 0),
+        }
+
+        first = statistics[("5minute", 0)]
+        assert (first.min, first.mean, first.max, first.last, first.count) == (
+            10,
+            20,
+            30,
+            30,
+            2,
+        )
+        second = statistics[("5minute", 5)]
+        assert (second.min, second.mean, second.max, second.count) == (5, 5, 5, 1)
+        hour = statistics[("hour", 0)]
+        assert (hour.min, hour.mean, hour.max, hour.last, hour.count) == (
+            5,
+            15,
+            30,
+            5,
+            3,
+        )
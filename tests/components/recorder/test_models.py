@@ -20,6 +20,8 @@ import homeassistant.core as ha
 from homeassistant.exceptions import InvalidEntityFormatError
 from homeassistant.util import dt
 
+from tests.async_mock import patch
+
 ENGINE = None
 SESSION = None
 
@@ -54,6 +56,15 @@ class TestEvents(unittest.TestCase):
         event = ha.Event("test_event", {"some_data": 15})
         assert event == Events.from_event(event).to_native()
 
+    def test_from_event_with_encoded_data(self):
+        """Test converting event to db event with already encoded data."""
+        event = ha.Event("test_event", {"some_data": 15})
+        with patch("homeassistant.components.recorder.models.json.dumps") as mock_dumps:
+            dbevent = Events.from_event(event, event_data="{}")
+        assert not mock_dumps.called
+        assert dbevent.event_data == "{}"
+        assert dbevent.event_type == "test_event"
+
 
 class TestStates(unittest.TestCase):
     """Test States model."""
@@ -3,9 +3,17 @@ from datetime import datetime, timedelta
 import json
 import unittest
 
+import pytest
+import voluptuous as vol
+
 from homeassistant.components import recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+)
 from homeassistant.components.recorder.purge import purge_old_data
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.util import dt as dt_util
@@ -135,6 +143,49 @@ class TestRecorderPurge(unittest.TestCase):
             # we should only have 2 states left after purging
             assert states.count() == 2
 
+    def test_purge_old_states_in_batches(self):
+        """Test old states are deleted in batches."""
+        self._add_test_states()
+        with session_scope(hass=self.hass) as session:
+            states = session.query(States)
+            assert states.count() == 6
+
+            with patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 3):
+                assert not purge_old_data(self.hass.data[DATA_INSTANCE], 4, False)
+                assert states.count() == 3
+                assert not purge_old_data(self.hass.data[DATA_INSTANCE], 4, False)
+                assert states.count() == 2
+                while not purge_old_data(self.hass.data[DATA_INSTANCE], 4, False):
+                    pass
+
+            assert states.count() == 2
+
+    def test_purge_unused_state_attributes(self):
+        """Test deleting state attributes no longer used by any state."""
+        self._add_test_states()
+        with session_scope(hass=self.hass) as session:
+            for state in session.query(States).filter(States.state == "autopurgeme"):
+                state.state_attributes = StateAttributes.from_shared_attrs(
+                    json.dumps({"purge": True})
+                )
+            for state in session.query(States).filter(States.state == "dontpurgeme"):
+                state.state_attributes = StateAttributes.from_shared_attrs(
+                    json.dumps({"purge": False})
+                )
+
+        with session_scope(hass=self.hass) as session:
+            state_attributes = session.query(StateAttributes)
+            assert state_attributes.count() == 4
+
+            purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+
+            # only the attributes of the 2 states left remain
+            assert state_attributes.count() == 2
+            assert all(
+                attributes.to_native() == {"purge": False}
+                for attributes in state_attributes
+            )
+
     def test_purge_old_events(self):
         """Test deleting old events."""
         self._add_test_events()
@@ -209,6 +260,73 @@ class TestRecorderPurge(unittest.TestCase):
                 self.hass.block_till_done()
                 self.hass.data[DATA_INSTANCE].block_till_done()
                 assert (
-                    mock_logger.debug.mock_calls[4][1][0]
+                    mock_logger.debug.mock_calls[2][1][0]
                     == "Vacuuming SQL DB to free space"
                 )
+
+    def test_purge_with_retention_rules(self):
+        """Test states matching retention rules are kept for their keep_days."""
+        now = datetime.now()
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+        self.hass.data[DATA_INSTANCE].retention = recorder.CONFIG_SCHEMA(
+            {
+                recorder.DOMAIN: {
+                    "retention": [
+                        {"domains": "sensor", "keep_days": 2},
+                        {"entity_globs": "binary_sensor.*_door", "keep_days": 365},
+                    ]
+                }
+            }
+        )[recorder.DOMAIN]["retention"]
+
+        with session_scope(hass=self.hass) as session:
+            for entity_id, days_ago in (
+                ("sensor.power", 3),
+                ("sensor.power", 0),
+                ("binary_sensor.front_door", 20),
+                ("binary_sensor.front_door", 0),
+                ("light.kitchen", 20),
+                ("light.kitchen", 5),
+            ):
+                timestamp = now - timedelta(days=days_ago)
+                session.add(
+                    States(
+                        entity_id=entity_id,
+                        domain=entity_id.split(".")[0],
+                        state=f"{days_ago}_days_ago",
+                        attributes="{}",
+                        last_changed=timestamp,
+                        last_updated=timestamp,
+                        event=Events(
+                            event_type="state_changed",
+                            event_data="{}",
+                            origin="LOCAL",
+                            time_fired=timestamp,
+                        ),
+                    )
+                )
+
+        with session_scope(hass=self.hass) as session:
+            while not purge_old_data(self.hass.data[DATA_INSTANCE], 10, False):
+                pass
+
+            states = {(state.entity_id, state.state) for state in session.query(States)}
+            assert states == {
+                ("sensor.power", "0_days_ago"),
+                ("binary_sensor.front_door", "20_days_ago"),
+                ("binary_sensor.front_door", "0_days_ago"),
+                ("light.kitchen", "5_days_ago"),
+            }
+            assert (
+                session.query(Events)
+                .filter(Events.event_type == "state_changed")
+                .count()
+                == 4
+            )
+
+
+def test_retention_rule_requires_entities():
+    """Test a retention rule needs domains, entities or entity globs."""
+    with pytest.raises(vol.Invalid):
+        recorder.CONFIG_SCHEMA({recorder.DOMAIN: {"retention": [{"keep_days": 2}]}})
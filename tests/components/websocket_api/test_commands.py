@@ -1,18 +1,19 @@
 """Tests for WebSocket API commands."""
 from async_timeout import timeout
 
-from homeassistant.components.websocket_api import const
+from homeassistant.components.websocket_api import const, messages
 from homeassistant.components.websocket_api.auth import (
     TYPE_AUTH,
     TYPE_AUTH_OK,
     TYPE_AUTH_REQUIRED,
 )
 from homeassistant.components.websocket_api.const import URL
-from homeassistant.core import callback
+from homeassistant.core import State, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.loader import async_get_integration
 from homeassistant.setup import async_setup_component
 
+from tests.async_mock import patch
 from tests.common import async_mock_service
 
 
@@ -198,16 +199,44 @@ async def test_get_states(hass, websocket_client):
     assert msg["type"] == const.TYPE_RESULT
     assert msg["success"]
 
-    states = []
-    for state in hass.states.async_all():
-        state = state.as_dict()
-        state["last_changed"] = state["last_changed"].isoformat()
-        state["last_updated"] = state["last_updated"].isoformat()
-        states.append(state)
+    states = [state.as_dict() for state in hass.states.async_all()]
 
     assert msg["result"] == states
 
 
+async def test_get_states_shared_until_state_change(hass, websocket_client):
+    """Test the JSON of get_states is shared until a state changes."""
+    hass.states.async_set("greeting.hello", "world")
+    hass.states.async_set("greeting.bye", "universe")
+
+    with patch(
+        "homeassistant.core.State.as_json", autospec=True, side_effect=State.as_json
+    ) as mock_as_json:
+        await websocket_client.send_json({"id": 5, "type": "get_states"})
+        msg = await websocket_client.receive_json()
+        assert msg["id"] == 5
+        assert msg["success"]
+        assert len(mock_as_json.mock_calls) == 2
+
+        await websocket_client.send_json({"id": 6, "type": "get_states"})
+        msg = await websocket_client.receive_json()
+        assert msg["id"] == 6
+        assert msg["success"]
+        assert len(mock_as_json.mock_calls) == 2
+
+        hass.states.async_set("greeting.hello", "moon")
+
+        await websocket_client.send_json({"id": 7, "type": "get_states"})
+        msg = await websocket_client.receive_json()
+        assert msg["id"] == 7
+        assert len(mock_as_json.mock_calls) == 4
+
+    states = [state.as_dict() for state in hass.states.async_all()]
+
+    assert msg["result"] == states
+    assert msg["result"][0]["state"] == "moon"
+
+
 async def test_get_services(hass, websocket_client):
     """Test get_services command."""
     await websocket_client.send_json({"id": 5, "type": "get_services"})
@@ -388,6 +417,180 @@ async def test_subscribe_unsubscribe_events_state_changed(
     assert msg["event"]["data"]["entity_id"] == "light.permitted"
 
 
+async def test_subscribe_events_shared_between_connections(
+    hass, websocket_client, hass_ws_client
+):
+    """Test events are serialized once for all subscriptions."""
+    other_client = await hass_ws_client(hass)
+    init_count = sum(hass.bus.async_listeners().values())
+
+    await websocket_client.send_json(
+        {"id": 5, "type": "subscribe_events", "event_type": "state_changed"}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    await other_client.send_json(
+        {"id": 8, "type": "subscribe_events", "event_type": "state_changed"}
+    )
+    msg = await other_client.receive_json()
+    assert msg["success"]
+
+    assert sum(hass.bus.async_listeners().values()) == init_count + 1
+
+    with patch(
+        "homeassistant.components.websocket_api.messages.event_message_json",
+        wraps=messages.event_message_json,
+    ) as mock_event_message_json:
+        hass.states.async_set("light.kitchen", "on")
+
+        msg = await websocket_client.receive_json()
+        assert msg["id"] == 5
+        assert msg["type"] == "event"
+        assert msg["event"]["data"]["entity_id"] == "light.kitchen"
+
+        other_msg = await other_client.receive_json()
+        assert other_msg["id"] == 8
+        assert other_msg["event"] == msg["event"]
+
+    assert len(mock_event_message_json.mock_calls) == 1
+
+    await websocket_client.send_json(
+        {"id": 6, "type": "unsubscribe_events", "subscription": 5}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    assert sum(hass.bus.async_listeners().values()) == init_count + 1
+
+    await other_client.send_json(
+        {"id": 9, "type": "unsubscribe_events", "subscription": 8}
+    )
+    msg = await other_client.receive_json()
+    assert msg["success"]
+    assert sum(hass.bus.async_listeners().values()) == init_count
+
+
+async def test_subscribe_states_filtered(hass, websocket_client):
+    """Test subscribing to the states of entities and domains."""
+    await websocket_client.send_json(
+        {
+            "id": 5,
+            "type": "subscribe_states",
+            "entity_ids": ["light.kitchen"],
+            "domains": ["switch"],
+            "attributes": ["color"],
+        }
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    hass.states.async_set("light.bedroom", "on")
+    hass.states.async_set("sensor.temperature", "21")
+    hass.states.async_set("light.kitchen", "on", {"color": "red", "brightness": 3})
+    hass.states.async_set("switch.fan", "off")
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == "event"
+    assert msg["event"]["event_type"] == "state_changed"
+    assert msg["event"]["data"]["entity_id"] == "light.kitchen"
+    assert msg["event"]["data"]["old_state"] is None
+    assert msg["event"]["data"]["new_state"]["state"] == "on"
+    assert msg["event"]["data"]["new_state"]["attributes"] == {"color": "red"}
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["data"]["entity_id"] == "switch.fan"
+    assert msg["event"]["data"]["new_state"]["attributes"] == {}
+
+    hass.states.async_set("light.kitchen", "off", {"color": "red", "brightness": 3})
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["data"]["old_state"]["state"] == "on"
+    assert msg["event"]["data"]["old_state"]["attributes"] == {"color": "red"}
+    assert msg["event"]["data"]["new_state"]["state"] == "off"
+
+
+async def test_subscribe_states_permissions(hass, websocket_client, hass_admin_user):
+    """Test subscribing to all states only forwards the readable ones."""
+    hass_admin_user.groups = []
+    hass_admin_user.mock_policy({"entities": {"entity_ids": {"light.permitted": True}}})
+
+    await websocket_client.send_json({"id": 5, "type": "subscribe_states"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    hass.states.async_set("light.not_permitted", "on")
+    hass.states.async_set("light.permitted", "on", {"color": "red"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["event"]["data"]["entity_id"] == "light.permitted"
+    assert msg["event"]["data"]["new_state"]["attributes"] == {"color": "red"}
+
+
+async def test_subscribe_states_compressed(hass, websocket_client):
+    """Test subscribing to compressed states."""
+    hass.states.async_set("light.kitchen", "on", {"color": "red", "brightness": 3})
+    hass.states.async_set("sensor.temperature", "21")
+    light_state = hass.states.get("light.kitchen")
+
+    await websocket_client.send_json(
+        {"id": 5, "type": "subscribe_states", "domains": ["light"], "compressed": True}
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == "event"
+    assert msg["event"] == {
+        "a": {
+            "light.kitchen": {
+                "s": "on",
+                "a": {"color": "red", "brightness": 3},
+                "c": light_state.context.id,
+                "lc": light_state.last_changed.timestamp(),
+            }
+        }
+    }
+
+    hass.states.async_set("sensor.temperature", "22")
+    hass.states.async_set("light.kitchen", "on", {"color": "blue"})
+
+    msg = await websocket_client.receive_json()
+    light_state = hass.states.get("light.kitchen")
+    assert msg["event"] == {
+        "c": {
+            "light.kitchen": {
+                "+": {
+                    "a": {"color": "blue"},
+                    "c": light_state.context.id,
+                    "lu": light_state.last_updated.timestamp(),
+                },
+                "-": {"a": ["brightness"]},
+            }
+        }
+    }
+
+    hass.states.async_set("light.bedroom", "off")
+
+    msg = await websocket_client.receive_json()
+    assert list(msg["event"]["a"]) == ["light.bedroom"]
+    assert msg["event"]["a"]["light.bedroom"]["s"] == "off"
+
+    hass.states.async_remove("light.kitchen")
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"r": ["light.kitchen"]}
+
+
 async def test_render_template_renders_template(
     hass, websocket_client, hass_admin_user
 ):
@@ -5,9 +5,11 @@ from aiohttp import WSMsgType
 import pytest
 
 from homeassistant.components.websocket_api import const, http
+from homeassistant.components.websocket_api.auth import TYPE_AUTH_REQUIRED
+from homeassistant.setup import async_setup_component
 from homeassistant.util.dt import utcnow
 
-from tests.async_mock import patch
+from tests.async_mock import Mock, patch
 from tests.common import async_fire_time_changed
 
 
@@ -51,7 +53,7 @@ async def test_pending_msg_peak(hass, mock_low_peak, hass_ws_client, caplog):
 
     # Kill writer task and fill queue past peak
     for _ in range(5):
-        instance._to_write.put_nowait(None)
+        instance._send_message(None)
 
     # Trigger the peak check
     instance._send_message({})
@@ -66,6 +68,46 @@ async def test_pending_msg_peak(hass, mock_low_peak, hass_ws_client, caplog):
     assert "Client unable to keep up with pending messages" in caplog.text
 
 
+async def test_pending_state_messages_coalesced(hass, mock_low_peak):
+    """Test pending messages with the same key are coalesced past the peak."""
+    handler = http.WebSocketHandler(hass, Mock())
+
+    for idx in range(4):
+        handler._send_message({"id": idx}, coalesce_key=(1, "light.kitchen"))
+
+    assert handler.pending_messages == 4
+
+    handler._send_message({"id": 4}, coalesce_key=(1, "light.kitchen"))
+    handler._send_message({"id": 5}, coalesce_key=(1, "light.bedroom"))
+    handler._send_message({"id": 6}, coalesce_key=(1, "light.kitchen"))
+    handler._send_message({"id": 7})
+
+    assert handler.pending_messages == 7
+    assert handler.writer_stats.coalesced_messages == 1
+    assert handler.writer_stats.peak_pending_messages == 7
+    assert [handler._pop_message()["id"] for _ in range(7)] == [0, 1, 2, 3, 6, 5, 7]
+
+
+async def test_coalesce_messages_in_frames(hass, websocket_client):
+    """Test pending messages are sent in one frame when supported."""
+    await websocket_client.send_json(
+        {"id": 5, "type": "supported_features", "features": {"coalesce_messages": 1}}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["success"]
+
+    for idx in range(6, 9):
+        await websocket_client.send_json({"id": idx, "type": "ping"})
+
+    msg = await websocket_client.receive_json()
+    assert msg == [
+        {"id": 6, "type": "pong"},
+        {"id": 7, "type": "pong"},
+        {"id": 8, "type": "pong"},
+    ]
+
+
 async def test_non_json_message(hass, websocket_client, caplog):
     """Test trying to serialze non JSON objects."""
     bad_data = object()
@@ -80,3 +122,18 @@ async def test_non_json_message(hass, websocket_client, caplog):
         f"Unable to serialize to JSON. Bad data found at $.result[0](state: test_domain.entity).attributes.bad={bad_data}(<class 'object'>"
         in caplog.text
     )
+
+
+async def test_permessage_deflate(hass, aiohttp_client):
+    """Test permessage-deflate is negotiated when offered by the client."""
+    assert await async_setup_component(hass, "websocket_api", {})
+    await hass.async_block_till_done()
+
+    client = await aiohttp_client(hass.http.app)
+    ws = await client.ws_connect(const.URL, compress=15)
+    assert ws.compress == 15
+
+    auth_required = await ws.receive_json()
+    assert auth_required["type"] == TYPE_AUTH_REQUIRED
+
+    await ws.close()
@@ -9,9 +9,10 @@ import pytest
 from homeassistant.const import ATTR_DEVICE_CLASS, STATE_UNAVAILABLE
 from homeassistant.core import Context
 from homeassistant.helpers import entity, entity_registry
+import homeassistant.util.dt as dt_util
 
 from tests.async_mock import MagicMock, PropertyMock, patch
-from tests.common import get_test_home_assistant, mock_registry
+from tests.common import async_fire_time_changed, get_test_home_assistant, mock_registry
 
 
 def test_generate_entity_id_requires_hass_or_ids():
@@ -690,3 +691,92 @@ async def test_warn_slow_write_state_custom_component(hass, caplog):
         "(<class 'custom_components.bla.sensor.test_warn_slow_write_state_custom_component.<locals>.CustomComponentEntity'>) "
         "took 10.000 seconds. Please report it to the custom component author."
     ) in caplog.text
+
+
+async def test_write_unchanged_state_skipped(hass):
+    """Test writing an unchanged state does not build and set it again."""
+    attributes = {"power": 10}
+
+    class PowerEntity(entity.Entity):
+        """Entity that returns the same attributes dict."""
+
+        @property
+        def state(self):
+            """Return the state."""
+            return "on"
+
+        @property
+        def device_state_attributes(self):
+            """Return the attributes."""
+            return attributes
+
+    ent = PowerEntity()
+    ent.hass = hass
+    ent.entity_id = "hello.world"
+
+    with patch.object(
+        hass.states, "async_set", wraps=hass.states.async_set
+    ) as async_set:
+        ent.async_write_ha_state()
+        ent.async_write_ha_state()
+        assert len(async_set.mock_calls) == 1
+
+        # Attributes changed in place are still written
+        attributes["power"] = 20
+        ent.async_write_ha_state()
+        assert len(async_set.mock_calls) == 2
+        assert hass.states.get("hello.world").attributes["power"] == 20
+
+        # The state was overwritten by someone else
+        hass.states.async_set("hello.world", "off")
+        ent.async_write_ha_state()
+        assert hass.states.get("hello.world").state == "on"
+
+        # Forced updates are always written
+        async_set.reset_mock()
+        with patch.object(PowerEntity, "force_update", PropertyMock(return_value=True)):
+            ent.async_write_ha_state()
+        assert len(async_set.mock_calls) == 1
+
+
+async def test_state_write_interval(hass):
+    """Test writes within the state write interval are coalesced."""
+    power = 10
+
+    class PowerEntity(entity.Entity):
+        """Entity writing its state at most every 2 seconds."""
+
+        @property
+        def state(self):
+            """Return the state."""
+            return power
+
+        @property
+        def state_write_interval(self):
+            """Return the state write interval."""
+            return timedelta(seconds=2)
+
+    ent = PowerEntity()
+    ent.hass = hass
+    ent.entity_id = "sensor.power"
+
+    ent.async_write_ha_state()
+    assert hass.states.get("sensor.power").state == "10"
+
+    power = 20
+    ent.async_write_ha_state()
+    power = 30
+    ent.async_write_ha_state()
+    assert hass.states.get("sensor.power").state == "10"
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.power").state == "30"
+
+    # A pending write is dropped when the entity is removed
+    power = 40
+    ent.async_write_ha_state()
+    await ent.async_remove()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.power") is None
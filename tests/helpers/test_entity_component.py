@@ -12,6 +12,7 @@ import homeassistant.core as ha
 from homeassistant.exceptions import PlatformNotReady
 from homeassistant.helpers import discovery
 from homeassistant.helpers.entity_component import EntityComponent
+from homeassistant.helpers.entity_platform import POLLING_MAX_JITTER
 from homeassistant.setup import async_setup_component
 import homeassistant.util.dt as dt_util
 
@@ -98,7 +99,7 @@ async def test_setup_does_discovery(mock_setup_component, mock_setup, hass):
     assert ("platform_test", {}, {"msg": "discovery_info"}) == mock_setup.call_args[0]
 
 
-@patch("homeassistant.helpers.entity_platform.async_track_time_interval")
+@patch("homeassistant.helpers.entity_platform.async_track_point_in_utc_time")
 async def test_set_scan_interval_via_config(mock_track, hass):
     """Test the setting of the scan interval via configuration."""
 
@@ -110,13 +111,17 @@ async def test_set_scan_interval_via_config(mock_track, hass):
 
     component = EntityComponent(_LOGGER, DOMAIN, hass)
 
-    component.setup(
-        {DOMAIN: {"platform": "platform", "scan_interval": timedelta(seconds=30)}}
-    )
+    now = dt_util.utcnow()
+    with patch("homeassistant.util.dt.utcnow", return_value=now):
+        component.setup(
+            {DOMAIN: {"platform": "platform", "scan_interval": timedelta(seconds=30)}}
+        )
+        await hass.async_block_till_done()
 
-    await hass.async_block_till_done()
     assert mock_track.called
-    assert timedelta(seconds=30) == mock_track.call_args[0][2]
+    next_poll = mock_track.call_args[0][2]
+    assert now + timedelta(seconds=30) - POLLING_MAX_JITTER <= next_poll
+    assert next_poll <= now + timedelta(seconds=30)
 
 
 async def test_set_entity_namespace_via_config(hass):
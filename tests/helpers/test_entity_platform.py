@@ -16,7 +16,7 @@ from homeassistant.helpers.entity_component import (
 )
 import homeassistant.util.dt as dt_util
 
-from tests.async_mock import Mock, patch
+from tests.async_mock import AsyncMock, Mock, patch
 from tests.common import (
     MockConfigEntry,
     MockEntity,
@@ -90,6 +90,84 @@ async def test_polling_updates_entities_with_exception(hass):
     assert len(update_err) == 1
 
 
+async def test_polling_backs_off_failing_entities(hass):
+    """Test failing entities are skipped for an increasing number of rounds."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+
+    updates = []
+    fail = True
+
+    def update_mock():
+        """Mock update that fails on demand."""
+        updates.append(None)
+        if fail:
+            raise AssertionError("Fake error update")
+
+    ent = MockEntity(should_poll=True)
+    ent.update = update_mock
+    ok_ent = MockEntity(should_poll=True)
+    ok_ent.update = Mock()
+
+    await component.async_add_entities([ent, ok_ent])
+
+    async def poll_rounds(rounds):
+        """Run polling rounds."""
+        for _ in range(rounds):
+            async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+            await hass.async_block_till_done()
+
+    # Fails, then is skipped one round
+    await poll_rounds(2)
+    assert len(updates) == 1
+
+    # Fails again, then is skipped two rounds
+    await poll_rounds(3)
+    assert len(updates) == 2
+
+    # Succeeds, and is updated every round again
+    fail = False
+    await poll_rounds(3)
+    assert len(updates) == 5
+    assert len(ok_ent.update.mock_calls) == 8
+
+    stats = ent.platform.polling_stats
+    assert stats.rounds == 8
+    assert stats.updates == 13
+    assert stats.failed_updates == 2
+    assert stats.skipped_updates == 3
+    assert stats.overruns == 0
+
+
+async def test_polling_skips_entities_still_updating(hass, caplog):
+    """Test a slow entity does not hold up the other entities."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_update():
+        """Mock slow update."""
+        started.set()
+        await release.wait()
+
+    slow_ent = MockEntity(should_poll=True)
+    slow_ent.async_update = Mock(side_effect=slow_update)
+    ok_ent = MockEntity(should_poll=True)
+    ok_ent.async_update = AsyncMock()
+
+    await component.async_add_entities([slow_ent, ok_ent])
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+    await started.wait()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+    release.set()
+    await hass.async_block_till_done()
+
+    assert len(slow_ent.async_update.mock_calls) == 1
+    assert len(ok_ent.async_update.mock_calls) == 2
+    assert slow_ent.platform.polling_stats.overruns == 1
+    assert "took longer than the scheduled update interval" in caplog.text
+
+
 async def test_update_state_adds_entities(hass):
     """Test if updating poll entities cause an entity to be added works."""
     component = EntityComponent(_LOGGER, DOMAIN, hass)
@@ -135,7 +213,7 @@ async def test_update_state_adds_entities_with_update_before_add_false(hass):
     assert not ent.update.called
 
 
-@patch("homeassistant.helpers.entity_platform.async_track_time_interval")
+@patch("homeassistant.helpers.entity_platform.async_track_point_in_utc_time")
 async def test_set_scan_interval_via_platform(mock_track, hass):
     """Test the setting of the scan interval via platform."""
 
@@ -150,11 +228,15 @@ async def test_set_scan_interval_via_platform(mock_track, hass):
 
     component = EntityComponent(_LOGGER, DOMAIN, hass)
 
-    component.setup({DOMAIN: {"platform": "platform"}})
+    now = dt_util.utcnow()
+    with patch("homeassistant.util.dt.utcnow", return_value=now):
+        component.setup({DOMAIN: {"platform": "platform"}})
+        await hass.async_block_till_done()
 
-    await hass.async_block_till_done()
     assert mock_track.called
-    assert timedelta(seconds=30) == mock_track.call_args[0][2]
+    next_poll = mock_track.call_args[0][2]
+    assert now + timedelta(seconds=30) - entity_platform.POLLING_MAX_JITTER <= next_poll
+    assert next_poll <= now + timedelta(seconds=30)
 
 
 async def test_adding_entities_with_generator_and_thread_callback(hass):
@@ -1,12 +1,13 @@
 """Test event helpers."""
 # pylint: disable=protected-access
+import asyncio
 from datetime import datetime, timedelta
 
 from astral import Astral
 import pytest
 
 from homeassistant.components import sun
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL
 import homeassistant.core as ha
 from homeassistant.core import callback
 from homeassistant.helpers.event import (
@@ -85,6 +86,29 @@ async def test_track_point_in_time(hass):
     assert len(runs) == 2
 
 
+async def test_track_point_in_time_loop_timer(hass):
+    """Test point in time listeners run from a loop timer at their time."""
+    runs = []
+    now = dt_util.utcnow()
+
+    async_track_point_in_utc_time(
+        hass, callback(lambda x: runs.append(x)), now + timedelta(seconds=0.1)
+    )
+    unsub = async_track_point_in_utc_time(
+        hass, callback(lambda x: runs.append(x)), now + timedelta(seconds=0.1)
+    )
+    async_track_point_in_utc_time(
+        hass, callback(lambda x: runs.append(x)), now + timedelta(seconds=0.05)
+    )
+    unsub()
+    assert hass.bus.async_listeners()[EVENT_TIME_CHANGED] == 1
+
+    await asyncio.sleep(0.2)
+    assert len(runs) == 2
+    assert now + timedelta(seconds=0.05) <= runs[0] < runs[1]
+    assert EVENT_TIME_CHANGED not in hass.bus.async_listeners()
+
+
 async def test_track_state_change(hass):
     """Test track_state_change."""
     # 2 lists to track how often our callbacks get called
@@ -163,6 +187,52 @@ async def test_track_state_change(hass):
     assert len(wildercard_runs) == 6
 
 
+async def test_track_state_change_dispatch_by_entity_id(hass):
+    """Test state change trackers share one listener dispatching by entity_id."""
+    bowl_runs = []
+    kitchen_runs = []
+
+    @ha.callback
+    def bowl_run_callback(entity_id, old_state, new_state):
+        bowl_runs.append(entity_id)
+
+    @ha.callback
+    def kitchen_run_callback(entity_id, old_state, new_state):
+        kitchen_runs.append(entity_id)
+
+    @ha.callback
+    def failing_run_callback(entity_id, old_state, new_state):
+        raise ValueError
+
+    unsub_failing = async_track_state_change(
+        hass, "switch.kitchen", failing_run_callback
+    )
+    unsub_bowl = async_track_state_change(
+        hass, ["light.bowl", "light.Bowl"], bowl_run_callback
+    )
+    unsub_kitchen = async_track_state_change(
+        hass, ["light.bowl", "switch.kitchen"], kitchen_run_callback
+    )
+    assert hass.bus.async_listeners()[EVENT_STATE_CHANGED] == 1
+
+    hass.states.async_set("light.bowl", "on")
+    hass.states.async_set("switch.kitchen", "on")
+    hass.states.async_set("switch.other", "on")
+    await hass.async_block_till_done()
+    assert bowl_runs == ["light.bowl"]
+    assert kitchen_runs == ["light.bowl", "switch.kitchen"]
+
+    unsub_bowl()
+    unsub_failing()
+    hass.states.async_set("light.bowl", "off")
+    await hass.async_block_till_done()
+    assert bowl_runs == ["light.bowl"]
+    assert kitchen_runs == ["light.bowl", "switch.kitchen", "light.bowl"]
+
+    unsub_kitchen()
+    assert EVENT_STATE_CHANGED not in hass.bus.async_listeners()
+
+
 async def test_track_template(hass):
     """Test tracking template."""
     specific_runs = []
@@ -230,6 +300,103 @@ async def test_track_template(hass):
     assert len(wildercard_runs) == 2
 
 
+async def test_track_template_follows_render_dependencies(hass):
+    """Test tracking template only renders again for the states it used."""
+    runs = []
+
+    template_condition = Template(
+        "{{ is_state('switch.test', 'on') and is_state('sensor.other', 'yes') }}", hass,
+    )
+
+    hass.states.async_set("switch.test", "off")
+    hass.states.async_set("sensor.other", "no")
+
+    @ha.callback
+    def run_callback(entity_id, old_state, new_state):
+        runs.append(entity_id)
+
+    unsub = async_track_template(hass, template_condition, run_callback)
+
+    with patch.object(
+        template_condition,
+        "async_render_to_info",
+        wraps=template_condition.async_render_to_info,
+    ) as mock_render:
+        # The last render stopped at the switch
+        hass.states.async_set("sensor.other", "yes")
+        await hass.async_block_till_done()
+        assert len(mock_render.mock_calls) == 0
+
+        hass.states.async_set("switch.test", "on")
+        await hass.async_block_till_done()
+        assert len(mock_render.mock_calls) == 1
+        assert runs == ["switch.test"]
+
+        hass.states.async_set("sensor.other", "no")
+        await hass.async_block_till_done()
+        hass.states.async_set("sensor.other", "yes")
+        await hass.async_block_till_done()
+        assert len(mock_render.mock_calls) == 3
+        assert runs == ["switch.test", "sensor.other"]
+
+        unsub()
+        hass.states.async_set("switch.test", "off")
+        await hass.async_block_till_done()
+        assert len(mock_render.mock_calls) == 3
+
+
+async def test_track_template_domain_iteration(hass):
+    """Test tracking a template iterating a domain."""
+    runs = []
+
+    template_condition = Template(
+        "{{ states.light | selectattr('state', 'eq', 'on') | list | count > 1 }}", hass,
+    )
+
+    hass.states.async_set("light.one", "on")
+
+    @ha.callback
+    def run_callback(entity_id, old_state, new_state):
+        runs.append(entity_id)
+
+    async_track_template(hass, template_condition, run_callback)
+
+    with patch.object(
+        template_condition,
+        "async_render_to_info",
+        wraps=template_condition.async_render_to_info,
+    ) as mock_render:
+        hass.states.async_set("switch.test", "on")
+        await hass.async_block_till_done()
+        assert len(mock_render.mock_calls) == 0
+
+        hass.states.async_set("light.two", "on")
+        await hass.async_block_till_done()
+        assert len(mock_render.mock_calls) == 1
+        assert runs == ["light.two"]
+
+        hass.states.async_set("light.one", "off")
+        await hass.async_block_till_done()
+        assert len(mock_render.mock_calls) == 2
+        assert runs == ["light.two"]
+
+
+async def test_track_template_without_states(hass):
+    """Test tracking templates that use no states."""
+    runs = []
+
+    @ha.callback
+    def run_callback(entity_id, old_state, new_state):
+        runs.append(entity_id)
+
+    async_track_template(hass, Template("true", hass), run_callback)
+    async_track_template(hass, Template("{{ true }}", hass), run_callback)
+
+    hass.states.async_set("switch.test", "on")
+    await hass.async_block_till_done()
+    assert runs == ["switch.test"]
+
+
 async def test_track_same_state_simple_trigger(hass):
     """Test track_same_change with trigger simple."""
     thread_runs = []
@@ -709,6 +876,32 @@ async def test_periodic_task_clock_rollback(hass):
     assert len(specific_runs) == 4
 
 
+async def test_periodic_tasks_share_time_listeners(hass):
+    """Test periodic tasks only wake up at their time."""
+    specific_runs = []
+
+    unsubs = [
+        async_track_utc_time_change(
+            hass, lambda x: specific_runs.append(1), minute="/5", second=0
+        )
+        for _ in range(10)
+    ]
+    # The point in time scheduler and the clock rollback detector
+    assert hass.bus.async_listeners()[EVENT_TIME_CHANGED] == 2
+
+    _send_time_changed(hass, datetime(2014, 5, 24, 12, 0, 0))
+    await hass.async_block_till_done()
+    assert len(specific_runs) == 10
+
+    _send_time_changed(hass, datetime(2014, 5, 24, 12, 5, 0))
+    await hass.async_block_till_done()
+    assert len(specific_runs) == 20
+
+    for unsub in unsubs:
+        unsub()
+    assert EVENT_TIME_CHANGED not in hass.bus.async_listeners()
+
+
 async def test_periodic_task_duplicate_time(hass):
     """Test periodic tasks not triggering on duplicate time."""
     specific_runs = []
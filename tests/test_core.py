@@ -3,6 +3,7 @@
 import asyncio
 from datetime import datetime, timedelta
 import functools
+import json
 import logging
 import os
 from tempfile import TemporaryDirectory
@@ -151,6 +152,53 @@ def test_async_run_job_delegates_non_async():
     assert len(hass.async_add_job.mock_calls) == 1
 
 
+def test_hass_job_type():
+    """Test the job type is resolved when the job is created."""
+
+    async def coro_job():
+        pass
+
+    def executor_job():
+        pass
+
+    assert ha.HassJob(coro_job).job_type == ha.HassJobType.Coroutinefunction
+    assert (
+        ha.HassJob(functools.partial(coro_job)).job_type
+        == ha.HassJobType.Coroutinefunction
+    )
+    assert ha.HassJob(ha.callback(MagicMock())).job_type == ha.HassJobType.Callback
+    assert (
+        ha.HassJob(functools.partial(ha.callback(MagicMock()))).job_type
+        == ha.HassJobType.Callback
+    )
+    assert ha.HassJob(executor_job).job_type == ha.HassJobType.Executor
+
+    coro = coro_job()
+    with pytest.raises(ValueError):
+        ha.HassJob(coro)
+    coro.close()
+
+
+def test_async_add_hass_job_schedules_by_job_type(loop):
+    """Test a HassJob is scheduled without inspecting the target again."""
+    hass = MagicMock(loop=MagicMock(wraps=loop))
+
+    async def coro_job():
+        pass
+
+    def executor_job():
+        pass
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(ha.callback(MagicMock())))
+    assert len(hass.loop.call_soon.mock_calls) == 1
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(coro_job))
+    assert len(hass.loop.create_task.mock_calls) == 1
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(executor_job))
+    assert len(hass.loop.run_in_executor.mock_calls) == 1
+
+
 def test_stage_shutdown():
     """Simulate a shutdown, test calling stuff."""
     hass = get_test_home_assistant()
@@ -520,6 +568,39 @@ def test_state_dict_conversion():
     assert state == ha.State.from_dict(state.as_dict())
 
 
+def test_state_as_dict_and_json_are_cached():
+    """Test the dict and JSON of a state are only created once."""
+    last_time = datetime(1984, 12, 8, 12, 0, 0, tzinfo=dt_util.UTC)
+    state = ha.State(
+        "light.kitchen",
+        "on",
+        {"brightness": 100},
+        last_changed=last_time,
+        last_updated=last_time,
+        context=ha.Context(id="abc"),
+    )
+    expected = {
+        "entity_id": "light.kitchen",
+        "state": "on",
+        "attributes": {"brightness": 100},
+        "last_changed": "1984-12-08T12:00:00+00:00",
+        "last_updated": "1984-12-08T12:00:00+00:00",
+        "context": {"id": "abc", "parent_id": None, "user_id": None},
+    }
+    as_dict = state.as_dict()
+    assert as_dict == expected
+    assert state.as_dict() is as_dict
+
+    with pytest.raises(RuntimeError):
+        as_dict["state"] = "off"
+    with pytest.raises(RuntimeError):
+        as_dict["attributes"]["brightness"] = 50
+
+    as_json = state.as_json()
+    assert json.loads(as_json) == expected
+    assert state.as_json() is as_json
+
+
 def test_state_dict_conversion_with_wrong_data():
     """Test conversion with wrong data."""
     assert ha.State.from_dict(None) is None
@@ -1367,3 +1448,80 @@ async def test_start_events(hass):
         EVENT_HOMEASSISTANT_STARTED,
     ]
     assert core_states == [ha.CoreState.starting, ha.CoreState.running]
+
+
+async def test_bus_dispatches_to_match_all_listeners(hass):
+    """Test the cached listeners follow listeners being added and removed."""
+    calls = []
+
+    @ha.callback
+    def match_all_listener(event):
+        calls.append(("all", event.event_type))
+
+    @ha.callback
+    def listener(event):
+        calls.append(("test", event.event_type))
+
+    unsub_test = hass.bus.async_listen("test_event", listener)
+    hass.bus.async_fire("test_event")
+    await hass.async_block_till_done()
+    assert calls == [("test", "test_event")]
+
+    calls.clear()
+    unsub_all = hass.bus.async_listen(MATCH_ALL, match_all_listener)
+    hass.bus.async_fire("test_event")
+    hass.bus.async_fire("other_event")
+    await hass.async_block_till_done()
+    assert calls == [
+        ("all", "test_event"),
+        ("test", "test_event"),
+        ("all", "other_event"),
+    ]
+
+    calls.clear()
+    unsub_test()
+    hass.bus.async_fire("test_event")
+    await hass.async_block_till_done()
+    assert calls == [("all", "test_event")]
+
+    calls.clear()
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    unsub_all()
+    hass.bus.async_fire("test_event")
+    await hass.async_block_till_done()
+    assert calls == []
+
+
+async def test_bus_event_filter(hass, caplog):
+    """Test listeners are only scheduled for events passing their filter."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        calls.append(event.data["value"])
+
+    @ha.callback
+    def event_filter(event):
+        return event.data["value"] % 2 == 0
+
+    @ha.callback
+    def broken_filter(event):
+        raise ValueError("Bad filter")
+
+    unsub = hass.bus.async_listen("test_event", listener, event_filter=event_filter)
+    hass.bus.async_listen("test_event", listener, event_filter=broken_filter)
+
+    with patch.object(hass, "async_add_hass_job", wraps=hass.async_add_hass_job) as add:
+        for value in range(4):
+            hass.bus.async_fire("test_event", {"value": value})
+        await hass.async_block_till_done()
+
+    assert calls == [0, 2]
+    assert len(add.mock_calls) == 2
+    assert "Error in event filter" in caplog.text
+
+    unsub()
+    hass.bus.async_fire("test_event", {"value": 4})
+    await hass.async_block_till_done()
+    assert calls == [0, 2]
+    assert hass.bus.async_listeners()["test_event"] == 1
@@ -0,0 +1,25 @@
+"""Test the ulid util."""
+import uuid
+
+from homeassistant.util import ulid as ulid_util
+
+from tests.async_mock import patch
+
+
+def test_ulid_hex():
+    """Verify we can generate a ulid that fits in a uuid."""
+    hex_ulid = ulid_util.ulid_hex()
+    assert len(hex_ulid) == 32
+    assert uuid.UUID(hex_ulid).hex == hex_ulid
+
+
+def test_ulid_hex_sorts_by_time():
+    """Verify ulids created later sort after earlier ones."""
+    with patch("homeassistant.util.ulid.time.time", return_value=1000.0):
+        first = ulid_util.ulid_hex()
+    with patch("homeassistant.util.ulid.time.time", return_value=1000.5):
+        second = ulid_util.ulid_hex()
+
+    assert first[:12] == f"{1000000:012x}"
+    assert second[:12] == f"{1000500:012x}"
+    assert first < second